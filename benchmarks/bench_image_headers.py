@@ -0,0 +1,66 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from image_headers import get_image_dimensions, get_image_dimensions_batch
+
+def pillow_dimensions(image_path):
+    # The previous organize_datatypes.get_aspect_ratio code path.
+    img = Image.open(image_path)
+    return img.size
+
+def create_sample_images(folder, count):
+    formats = [('JPEG', 'jpg'), ('PNG', 'png'), ('GIF', 'gif'), ('WEBP', 'webp')]
+    paths = []
+    for i in range(count):
+        image_format, extension = formats[i % len(formats)]
+        path = os.path.join(folder, f"sample_{i}.{extension}")
+        Image.new('RGB', (640 + i % 7, 480), color='red').save(path, format=image_format)
+        paths.append(path)
+    return paths
+
+def time_call(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<28} {best * 1000:9.2f} ms")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark header-only dimension reading against Pillow')
+    parser.add_argument('folder', nargs='?', help='Folder of images to read (default: generate samples)')
+    parser.add_argument('--count', type=int, default=2000, help='Number of generated sample images (default: 2000)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions, best time is reported (default: 5)')
+    parser.add_argument('--workers', type=int, default=None, help='Thread pool size for the batched reader')
+
+    args = parser.parse_args()
+    temp_folder = None
+    if args.folder:
+        paths = [os.path.join(args.folder, name) for name in sorted(os.listdir(args.folder))
+                 if os.path.isfile(os.path.join(args.folder, name))]
+    else:
+        temp_folder = tempfile.mkdtemp()
+        paths = create_sample_images(temp_folder, args.count)
+
+    try:
+        print(f"Reading dimensions of {len(paths)} files")
+        pillow = time_call("Pillow Image.open", lambda: [pillow_dimensions(p) for p in paths], args.repeat)
+        headers = time_call("get_image_dimensions", lambda: [get_image_dimensions(p) for p in paths], args.repeat)
+        batch = time_call("get_image_dimensions_batch",
+                          lambda: get_image_dimensions_batch(paths, args.workers), args.repeat)
+        print(f"Speedup (serial): {pillow / headers:.1f}x, (batched): {pillow / batch:.1f}x")
+    finally:
+        if temp_folder:
+            shutil.rmtree(temp_folder)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import sys
+import time
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from normalize import flatten_alpha
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def create_sample_images(count, size):
+    images = []
+    gradient = Image.linear_gradient('L').resize(size)
+    for _ in range(count):
+        images.append(Image.merge('RGBA', (gradient, gradient.rotate(90),
+                                           gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT), gradient)))
+    return images
+
+def numpy_tables(background):
+    # out[a, c] = (c * a + bg * (255 - a) + 127) // 255, one table per channel.
+    alpha = numpy.arange(256, dtype=numpy.uint32)[:, None]
+    value = numpy.arange(256, dtype=numpy.uint32)[None, :]
+    return [((value * alpha + b * (255 - alpha) + 127) // 255).astype(numpy.uint8).ravel() for b in background]
+
+def flatten_alpha_numpy(pixels, tables):
+    # Vectorized lookup over an (..., H, W, 4) array; works on a single image
+    # or a stack of same-sized images.
+    index = pixels[..., 3].astype(numpy.intp) << 8
+    out = numpy.empty(pixels.shape[:-1] + (3,), dtype=numpy.uint8)
+    for channel in range(3):
+        out[..., channel] = tables[channel][index | pixels[..., channel]]
+    return out
+
+def time_call(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<32} {best * 1000:9.2f} ms")
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark alpha flattening: Pillow compositing against NumPy')
+    parser.add_argument('--count', type=int, default=32, help='Number of images (default: 32)')
+    parser.add_argument('--width', type=int, default=1024, help='Image width (default: 1024)')
+    parser.add_argument('--height', type=int, default=1024, help='Image height (default: 1024)')
+    parser.add_argument('--repeat', type=int, default=5, help='Repetitions, best time is reported (default: 5)')
+
+    args = parser.parse_args()
+    images = create_sample_images(args.count, (args.width, args.height))
+    background = (255, 255, 255)
+    print(f"Flattening {args.count} RGBA images of {args.width}x{args.height}")
+
+    pillow = time_call("Pillow paste (flatten_alpha)", lambda: [flatten_alpha(img, background) for img in images],
+                       args.repeat)
+
+    if numpy is None:
+        print("NumPy is not installed; skipping the NumPy comparison")
+        return
+
+    tables = numpy_tables(background)
+    per_image = time_call("NumPy per image (incl. export)",
+                          lambda: [flatten_alpha_numpy(numpy.asarray(img), tables) for img in images], args.repeat)
+    stack = numpy.stack([numpy.asarray(img) for img in images])
+    kernel = time_call("NumPy stacked (kernel only)", lambda: flatten_alpha_numpy(stack, tables), args.repeat)
+    print(f"Pillow vs NumPy per image: {per_image / pillow:.2f}x, vs stacked kernel: {kernel / pillow:.2f}x")
+
+if __name__ == "__main__":
+    main()
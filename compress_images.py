@@ -1,33 +1,175 @@
 from PIL import Image
 import os
+import shutil
+import struct
 import argparse
+from scheduler import run_jobs, print_scheduler_stats
+from results import ResultSet, run_file
+from watch import watch_image_folder
+from normalize import normalize_image
+from profiling import add_profiling_arguments, profiler_from_args
+from metadata import (METADATA_POLICIES, convert_to_srgb, metadata_save_options, needs_srgb_conversion,
+                      new_metadata_stats, orientation_exif, print_metadata_stats, record_metadata)
 
-def compress_images_in_directory(input_dir, output_dir, quality, optimize):
+# ITU-T T.81 Annex K luminance table, in natural (row-major) order like
+# Pillow's ``quantization`` attribute.
+STANDARD_LUMINANCE_TABLE = [
+    16, 11, 10, 16, 24, 40, 51, 61,
+    12, 12, 14, 19, 26, 58, 60, 55,
+    14, 13, 16, 24, 40, 57, 69, 56,
+    14, 17, 22, 29, 51, 87, 80, 62,
+    18, 22, 37, 56, 68, 109, 103, 77,
+    24, 35, 55, 64, 81, 104, 113, 92,
+    49, 64, 78, 87, 103, 121, 120, 101,
+    72, 92, 95, 98, 112, 100, 103, 99,
+]
+
+# APP0 (JFIF) and APP14 (Adobe colour transform) affect decoding; every other
+# APPn segment and comments are metadata.
+JPEG_METADATA_MARKERS = {0xE1, 0xE2, 0xE3, 0xE4, 0xE5, 0xE6, 0xE7, 0xE8,
+                         0xE9, 0xEA, 0xEB, 0xEC, 0xED, 0xEF, 0xFE}
+
+def estimate_jpeg_quality(img):
+    tables = getattr(img, 'quantization', None)
+    if not tables or 0 not in tables or len(tables[0]) != 64:
+        return None
+    # Invert the IJG scaling: tables are the standard ones times a percentage.
+    # Entries clamped to the 8-bit maximum would understate low qualities.
+    pairs = [(q, std) for q, std in zip(tables[0], STANDARD_LUMINANCE_TABLE) if q < 255]
+    if not pairs:
+        return 1
+    scale = sum(q for q, _ in pairs) * 100 / sum(std for _, std in pairs)
+    if scale <= 100:
+        quality = (200 - scale) / 2
+    else:
+        quality = 5000 / scale
+    return max(1, min(100, round(quality)))
+
+def strip_jpeg_metadata(data, keep_icc=False, exif=None):
+    if data[:2] != b'\xff\xd8':
+        return None
+    output = [data[:2]]
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            return None
+        marker = data[position + 1]
+        if marker == 0xDA:
+            # Entropy-coded data follows; keep the rest byte for byte.
+            output.append(data[position:])
+            return b''.join(output)
+        length = struct.unpack('>H', data[position + 2:position + 4])[0]
+        segment_end = position + 2 + length
+        if segment_end > len(data):
+            return None
+        is_icc = marker == 0xE2 and data[position + 4:position + 16] == b'ICC_PROFILE\x00'
+        is_exif = marker == 0xE1 and data[position + 4:position + 10] == b'Exif\x00\x00'
+        if marker not in JPEG_METADATA_MARKERS or (keep_icc and is_icc):
+            output.append(data[position:segment_end])
+        elif is_exif and exif:
+            # Put the replacement EXIF where the original segment was.
+            output.append(b'\xff\xe1' + struct.pack('>H', len(exif) + 2) + exif)
+            exif = None
+        position = segment_end
+    return None
+
+def compress_jpeg_losslessly(input_path, output_path, metadata='icc-only', exif=None):
+    if metadata != 'keep':
+        with open(input_path, 'rb') as f:
+            data = f.read()
+        stripped = strip_jpeg_metadata(data, keep_icc=metadata == 'icc-only', exif=exif)
+        if stripped is not None and len(stripped) < len(data):
+            with open(output_path, 'wb') as f:
+                f.write(stripped)
+            return 'stripped', len(data) - len(stripped)
+    shutil.copyfile(input_path, output_path)
+    return 'copied', 0
+
+def compress_image(input_path, output_dir, quality, optimize, background=None,
+                   metadata='icc-only', convert_srgb=False, metadata_stats=None):
+    img = Image.open(input_path)
+    source_info = dict(img.info)
+
+    filename = os.path.basename(input_path)
+    file_ext = filename.lower().split('.')[-1]
+    base_name = filename.rsplit('.', 1)[0]
+
+    if file_ext in ['jpg', 'jpeg']:
+        output_path = os.path.join(output_dir, f"{base_name}_compressed.jpg")
+        source_quality = estimate_jpeg_quality(img) if img.format == 'JPEG' else None
+        lossless = source_quality is not None and quality >= source_quality
+        if lossless and not (convert_srgb and needs_srgb_conversion(img)):
+            # Re-encoding at the same or a higher quality cannot shrink the
+            # file without losing detail, so skip the decode entirely.
+            exif = orientation_exif(img.info.get('exif'))
+            img.close()
+            action, removed = compress_jpeg_losslessly(input_path, output_path, metadata, exif)
+            record_metadata(metadata_stats, removed)
+            return output_path, action, source_quality
+        output_format = 'JPEG'
+    else:
+        output_path = os.path.join(output_dir, f"{base_name}_compressed.png")
+        output_format = 'PNG'
+        source_quality = None
+
+    converted = False
+    if convert_srgb:
+        img, converted = convert_to_srgb(img)
+    options, removed = metadata_save_options(img.info, metadata, source_info, output_format)
+    img = normalize_image(img, output_format, background)
+    if output_format == 'JPEG':
+        img.save(output_path, format='JPEG', optimize=optimize, quality=quality, **options)
+    else:
+        img.save(output_path, format='PNG', optimize=optimize, **options)
+    record_metadata(metadata_stats, removed, converted)
+    return output_path, 'reencoded', source_quality
+
+def compress_images_in_directory(input_dir, output_dir, quality, optimize, workers=1, background=None,
+                                 metadata='icc-only', convert_srgb=False, profiler=None):
+    results = ResultSet()
+    metadata_stats = new_metadata_stats(metadata)
     try:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
         file_list = os.listdir(input_dir)
+        input_paths = []
 
         for filename in file_list:
             input_path = os.path.join(input_dir, filename)
 
             if os.path.isfile(input_path) and filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                img = Image.open(input_path)
-                
-                file_ext = filename.lower().split('.')[-1]
-                base_name = filename.rsplit('.', 1)[0]
-                
-                if file_ext in ['jpg', 'jpeg']:
-                    output_path = os.path.join(output_dir, f"{base_name}_compressed.jpg")
-                    img.save(output_path, format='JPEG', optimize=optimize, quality=quality)
-                else:
-                    output_path = os.path.join(output_dir, f"{base_name}_compressed.png")
-                    img.save(output_path, format='PNG', optimize=optimize)
-
-        print("Image compression successful!")
+                input_paths.append(input_path)
+
+        job = lambda path: compress_image(path, output_dir, quality, optimize, background,
+                                          metadata, convert_srgb, metadata_stats)
+        if profiler is not None:
+            job = profiler.wrap(job)
+        file_results, results.stats = run_jobs(lambda path: run_file(job, path), input_paths, workers)
+        results.extend(file_results)
+        results.stats['metadata'] = metadata_stats
+        for result in results.succeeded:
+            estimated = f", estimated quality {result.detail}" if result.detail is not None else ""
+            print(f"{os.path.basename(result.input_path)}: {result.action}{estimated}")
+        if workers > 1:
+            print_scheduler_stats(results.stats)
+        print_metadata_stats(metadata_stats)
+
+        if results.failed:
+            print(f"Image compression finished with {len(results.failed)} errors")
+        else:
+            print("Image compression successful!")
     except Exception as e:
+        results.error = f"{type(e).__name__}: {e}"
         print(f"Error during image compression: {e}")
+    return results
+
+def watch_and_compress(input_dir, output_dir, quality, optimize, workers=1, stop_event=None, background=None,
+                       metadata='icc-only', convert_srgb=False, profiler=None):
+    job = lambda path: compress_image(path, output_dir, quality, optimize, background, metadata, convert_srgb)
+    if profiler is not None:
+        job = profiler.wrap(job)
+    watch_image_folder(input_dir, output_dir, job, workers, stop_event)
 
 def main():
     parser = argparse.ArgumentParser(description='Compress images in a directory')
@@ -36,9 +178,26 @@ def main():
     parser.add_argument('--quality', type=int, default=50, help='JPEG quality (1-100, default: 50)')
     parser.add_argument('--optimize', action='store_true', default=True, help='Optimize images (default: True)')
     parser.add_argument('--no-optimize', dest='optimize', action='store_false', help='Disable optimization')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parallel workers, largest files first (default: 1)')
+    parser.add_argument('--watch', action='store_true', help='Keep running and compress new or changed images as they arrive')
+    parser.add_argument('--background', default=None, help='Flatten transparency onto this color, e.g. white or #f0f0f0 (JPEG outputs always use white by default)')
+    parser.add_argument('--metadata', choices=METADATA_POLICIES, default='icc-only', help='Which metadata to carry over: strip all, keep EXIF/XMP/ICC, or keep only the ICC profile (default: icc-only)')
+    parser.add_argument('--convert-srgb', action='store_true', help='Convert images with a non-sRGB ICC profile to sRGB')
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
-    compress_images_in_directory(args.input_dir, args.output_dir, args.quality, args.optimize)
+    profiler = profiler_from_args(args)
+    with profiler.run():
+        if args.watch:
+            try:
+                watch_and_compress(args.input_dir, args.output_dir, args.quality, args.optimize, args.workers,
+                                   background=args.background, metadata=args.metadata, convert_srgb=args.convert_srgb,
+                                   profiler=profiler)
+            except KeyboardInterrupt:
+                pass
+        else:
+            compress_images_in_directory(args.input_dir, args.output_dir, args.quality, args.optimize, args.workers,
+                                         args.background, args.metadata, args.convert_srgb, profiler)
 
 if __name__ == "__main__":
     main()
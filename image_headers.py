@@ -0,0 +1,109 @@
+import mmap
+import os
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+
+HEAD_SIZE = 32
+
+# Start-of-frame markers carry the frame size; DHT (C4), JPG (C8) and DAC (CC) do not.
+JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7,
+                    0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+# Markers without a length field.
+JPEG_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7, 0xD8}
+
+def read_head(fd, size=HEAD_SIZE):
+    if hasattr(os, 'pread'):
+        return os.pread(fd, size, 0)
+    os.lseek(fd, 0, os.SEEK_SET)
+    return os.read(fd, size)
+
+def png_dimensions(head):
+    if head[:8] != b'\x89PNG\r\n\x1a\n' or head[12:16] != b'IHDR' or len(head) < 24:
+        return None
+    return struct.unpack('>II', head[16:24])
+
+def gif_dimensions(head):
+    if head[:6] not in (b'GIF87a', b'GIF89a') or len(head) < 10:
+        return None
+    return struct.unpack('<HH', head[6:10])
+
+def webp_dimensions(head):
+    if head[:4] != b'RIFF' or head[8:12] != b'WEBP' or len(head) < 30:
+        return None
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20] == 0x2F:
+        bits = struct.unpack('<I', head[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        width = int.from_bytes(head[24:27], 'little') + 1
+        height = int.from_bytes(head[27:30], 'little') + 1
+        return width, height
+    return None
+
+def jpeg_dimensions(data):
+    if data[:2] != b'\xff\xd8':
+        return None
+    position = 2
+    end = len(data)
+    while position < end:
+        if data[position] != 0xFF:
+            return None
+        # Any number of 0xFF fill bytes may precede a marker.
+        while position < end and data[position] == 0xFF:
+            position += 1
+        if position >= end:
+            return None
+        marker = data[position]
+        position += 1
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA) or position + 2 > end:
+            return None
+        length = struct.unpack('>H', data[position:position + 2])[0]
+        if marker in JPEG_SOF_MARKERS:
+            if position + 7 > end:
+                return None
+            height, width = struct.unpack('>HH', data[position + 3:position + 7])
+            if width == 0 or height == 0:
+                return None
+            return width, height
+        position += length
+    return None
+
+def read_dimensions(fd):
+    head = read_head(fd)
+    if head[:2] == b'\xff\xd8':
+        # SOF may sit behind large APPn segments (EXIF thumbnails, ICC), so
+        # map the file and let the marker walk touch only the pages it needs.
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as data:
+            return jpeg_dimensions(data)
+    return png_dimensions(head) or gif_dimensions(head) or webp_dimensions(head)
+
+def get_image_dimensions(image_path):
+    dimensions = None
+    try:
+        fd = os.open(image_path, os.O_RDONLY)
+        try:
+            dimensions = read_dimensions(fd)
+        finally:
+            os.close(fd)
+    except (OSError, ValueError, struct.error):
+        dimensions = None
+    if dimensions is None:
+        with Image.open(image_path) as img:
+            dimensions = img.size
+    return dimensions
+
+def _safe_dimensions(image_path):
+    try:
+        return get_image_dimensions(image_path)
+    except Exception:
+        return None
+
+def get_image_dimensions_batch(image_paths, max_workers=None):
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_safe_dimensions, image_paths))
@@ -0,0 +1,173 @@
+import hashlib
+import io
+import threading
+from PIL import Image, PngImagePlugin
+
+try:
+    from PIL import ImageCms
+except ImportError:
+    ImageCms = None
+
+METADATA_POLICIES = ('strip', 'keep', 'icc-only')
+
+ORIENTATION_TAG = 0x0112
+
+# Modes a profile-to-sRGB transform is built for, and the mode it produces.
+SRGB_OUTPUT_MODES = {'RGB': 'RGB', 'RGBA': 'RGBA', 'CMYK': 'RGB'}
+
+# Primaries, greys and a skin tone; enough to tell sRGB's tone curve apart
+# from linear or gamma 1.8 variants with the same primaries.
+SRGB_PROBE_COLORS = [(0, 0, 0), (255, 255, 255), (32, 32, 32), (128, 128, 128), (200, 200, 200),
+                     (255, 0, 0), (0, 255, 0), (0, 0, 255), (200, 150, 100)]
+SRGB_PROBE_TOLERANCE = 2
+
+_transforms = {}
+_transforms_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_srgb_profile = None
+
+def new_metadata_stats(policy):
+    return {
+        'policy': policy,
+        'files': 0,
+        'bytes_removed': 0,
+        'icc_converted': 0,
+    }
+
+def record_metadata(stats, bytes_removed, converted=False):
+    if stats is None:
+        return
+    with _stats_lock:
+        stats['files'] += 1
+        stats['bytes_removed'] += bytes_removed
+        if converted:
+            stats['icc_converted'] += 1
+
+def print_metadata_stats(stats):
+    print(f"Metadata ({stats['policy']}): removed {stats['bytes_removed']} bytes from {stats['files']} files, "
+          f"converted {stats['icc_converted']} ICC profiles to sRGB")
+
+def metadata_size(value):
+    if value is None:
+        return 0
+    if isinstance(value, str):
+        return len(value.encode('utf-8'))
+    return len(value)
+
+def is_identity_transform(transform, mode):
+    # A profile whose transform to sRGB leaves these colours alone (within
+    # rounding) has sRGB's primaries and tone curve, whatever it is called.
+    if SRGB_OUTPUT_MODES[mode] != mode:
+        return False
+    probe = Image.new('RGB', (len(SRGB_PROBE_COLORS), 1))
+    probe.putdata(SRGB_PROBE_COLORS)
+    probe = probe.convert(mode)
+    converted = ImageCms.applyTransform(probe, transform)
+    for x, expected in enumerate(SRGB_PROBE_COLORS):
+        actual = converted.getpixel((x, 0))
+        if any(abs(a - b) > SRGB_PROBE_TOLERANCE for a, b in zip(actual, expected)):
+            return False
+    return True
+
+def get_srgb_transform(icc_profile, mode):
+    # Returns None when the profile already is sRGB or cannot be used.
+    global _srgb_profile
+    key = (hashlib.sha1(icc_profile).digest(), mode)
+    if key in _transforms:
+        return _transforms[key]
+    # Building a transform parses the profile and precomputes lookup tables,
+    # which costs far more than applying it, so each distinct profile is
+    # built once per process and shared across files and worker threads.
+    # Broken profiles are cached too, so they are reported only once.
+    with _transforms_lock:
+        if key not in _transforms:
+            try:
+                if _srgb_profile is None:
+                    _srgb_profile = ImageCms.createProfile('sRGB')
+                source = ImageCms.ImageCmsProfile(io.BytesIO(icc_profile))
+                transform = ImageCms.buildTransform(source, _srgb_profile, mode, SRGB_OUTPUT_MODES[mode])
+                if is_identity_transform(transform, mode):
+                    transform = None
+            except Exception as e:
+                print(f"Error while building sRGB transform: {e}")
+                transform = None
+            _transforms[key] = transform
+    return _transforms[key]
+
+def needs_srgb_conversion(img):
+    icc_profile = img.info.get('icc_profile')
+    if ImageCms is None or not icc_profile or img.mode not in SRGB_OUTPUT_MODES:
+        return False
+    return get_srgb_transform(icc_profile, img.mode) is not None
+
+def convert_to_srgb(img):
+    if not needs_srgb_conversion(img):
+        return img, False
+    transform = get_srgb_transform(img.info['icc_profile'], img.mode)
+    converted = ImageCms.applyTransform(img, transform)
+    # The pixels are now sRGB, which readers assume for untagged images, so
+    # no profile is carried forward.
+    converted.info = {key: value for key, value in img.info.items() if key != 'icc_profile'}
+    return converted, True
+
+def orientation_exif(exif):
+    # Returns EXIF holding only the source's Orientation tag, or None when the
+    # image displays upright without it.
+    if not exif:
+        return None
+    try:
+        source = Image.Exif()
+        source.load(exif)
+        orientation = source.get(ORIENTATION_TAG, 1)
+    except Exception:
+        return None
+    if orientation == 1:
+        return None
+    minimal = Image.Exif()
+    minimal[ORIENTATION_TAG] = orientation
+    return minimal.tobytes()
+
+def png_xmp_info(xmp):
+    # Pillow's PNG encoder ignores ``xmp=``; XMP goes in the iTXt chunk that
+    # readers (Pillow included) look it up under.
+    if isinstance(xmp, bytes):
+        xmp = xmp.decode('utf-8', 'replace')
+    pnginfo = PngImagePlugin.PngInfo()
+    pnginfo.add_itxt('XML:com.adobe.xmp', xmp)
+    return pnginfo
+
+def metadata_save_options(info, policy, source_info=None, output_format='JPEG'):
+    # Returns save() keyword arguments for the policy and how many bytes of
+    # the source's EXIF, XMP and ICC data they leave out. ``source_info`` is
+    # the metadata before any sRGB conversion, if it differs from ``info``.
+    source_info = info if source_info is None else source_info
+    options = {}
+    kept = 0
+    if policy == 'keep':
+        if info.get('exif'):
+            options['exif'] = info['exif']
+            kept += metadata_size(info['exif'])
+    else:
+        # Dropping EXIF entirely would lose the Orientation tag and show
+        # rotated photos sideways.
+        exif = orientation_exif(info.get('exif'))
+        if exif:
+            options['exif'] = exif
+            kept += len(exif)
+    if policy == 'keep':
+        if info.get('xmp'):
+            if output_format == 'PNG':
+                options['pnginfo'] = png_xmp_info(info['xmp'])
+            else:
+                options['xmp'] = info['xmp']
+            kept += metadata_size(info['xmp'])
+    if policy in ('keep', 'icc-only'):
+        options['icc_profile'] = info.get('icc_profile')
+        kept += metadata_size(info.get('icc_profile'))
+    else:
+        # Pass None explicitly: the PNG encoder otherwise falls back to the
+        # profile in the image's own info.
+        options['icc_profile'] = None
+
+    original = sum(metadata_size(source_info.get(key)) for key in ('exif', 'xmp', 'icc_profile'))
+    return options, original - kept
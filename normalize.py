@@ -0,0 +1,43 @@
+from PIL import Image, ImageColor
+
+DEFAULT_BACKGROUND = (255, 255, 255)
+
+# Modes that carry transparency and are first widened to RGBA.
+ALPHA_MODES = ('RGBA', 'LA', 'PA', 'RGBa', 'La')
+
+def parse_background(color):
+    if color is None:
+        return DEFAULT_BACKGROUND
+    if isinstance(color, str):
+        return ImageColor.getrgb(color)[:3]
+    return tuple(color)[:3]
+
+def has_alpha(img):
+    return img.mode in ALPHA_MODES or (img.mode == 'P' and 'transparency' in img.info)
+
+def to_rgba(img):
+    if img.mode == 'RGBA':
+        return img
+    return img.convert('RGBA')
+
+def flatten_alpha(img, background=DEFAULT_BACKGROUND):
+    # Pillow's masked paste composites in one C pass over the pixels; see
+    # benchmarks/bench_normalize.py for how it compares with NumPy.
+    rgba = to_rgba(img)
+    flattened = Image.new('RGB', rgba.size, parse_background(background))
+    flattened.paste(rgba, mask=rgba.getchannel('A'))
+    return flattened
+
+def widen_palette(img):
+    # Pillow only resamples palette images with nearest-neighbour, so they are
+    # widened before resizing.
+    if img.mode == 'P':
+        return img.convert('RGBA' if has_alpha(img) else 'RGB')
+    return img
+
+def normalize_image(img, output_format, background=None):
+    if has_alpha(img) and (output_format == 'JPEG' or background is not None):
+        return flatten_alpha(img, background)
+    if output_format == 'JPEG' and img.mode not in ('RGB', 'L', 'CMYK'):
+        return img.convert('RGB')
+    return img
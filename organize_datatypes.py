@@ -1,11 +1,14 @@
 import os
 import shutil
-from PIL import Image
+from image_headers import get_image_dimensions, get_image_dimensions_batch
+from video_metadata import get_video_aspect_ratio
+from results import ResultSet, run_file
+from watch import watch_folder
+from profiling import add_profiling_arguments, profiler_from_args
 
 def get_aspect_ratio(image_path):
     try:
-        img = Image.open(image_path)
-        width, height = img.size
+        width, height = get_image_dimensions(image_path)
         return width / height
     except Exception as e:
         print(f"Error while calculating aspect ratio: {e}")
@@ -35,8 +38,29 @@ def is_square_image(image_path):
         print(f"Error while checking square image: {e}")
         return False
 
+def get_image_bucket(image_path, dimensions=None):
+    # Unreadable images raise, so run_file records them as errors instead of
+    # copying them into a bucket.
+    width, height = dimensions or get_image_dimensions(image_path)
+    aspect_ratio = width / height
+    if aspect_ratio > 1.5:
+        return 'landscape_images'
+    if aspect_ratio < 1.0:
+        return 'portrait_images'
+    return 'square_images'
+
+def get_video_bucket(video_path):
+    aspect_ratio = get_video_aspect_ratio(video_path)
+    if aspect_ratio == 0:
+        return 'videos'
+    if aspect_ratio > 1.5:
+        return 'landscape_videos'
+    if aspect_ratio < 1.0:
+        return 'portrait_videos'
+    return 'square_videos'
+
 def is_video_file(file_path):
-    video_extensions = ('.mov', '.mp4')
+    video_extensions = ('.mov', '.mp4', '.m4v')
     return file_path.lower().endswith(video_extensions)
 
 def is_image_file(file_path):
@@ -49,62 +73,161 @@ def count_files(folder):
         count += len(files)
     return count
 
-def detect_and_copy_images(source_folder, destination_folder):
+def new_organize_stats():
+    return {
+        'scanned': 0,
+        'scanned_bytes': 0,
+        'copied': 0,
+        'copied_bytes': 0,
+        'failed': 0,
+        'failed_bytes': 0,
+        'buckets': {},
+        'extensions': {},
+    }
+
+def _add_to_tally(tally, key, size):
+    entry = tally.setdefault(key, {'files': 0, 'bytes': 0})
+    entry['files'] += 1
+    entry['bytes'] += size
+
+def record_copy(stats, bucket, file_path, size):
+    extension = os.path.splitext(file_path)[1].lower() or '(none)'
+    stats['copied'] += 1
+    stats['copied_bytes'] += size
+    _add_to_tally(stats['buckets'], bucket, size)
+    _add_to_tally(stats['extensions'], extension, size)
+
+def record_failure(stats, size):
+    stats['failed'] += 1
+    stats['failed_bytes'] += size
+
+def print_organize_stats(stats):
+    print(f"Total files scanned: {stats['scanned']} ({stats['scanned_bytes']} bytes)")
+    print(f"Total files copied to new folders: {stats['copied']} ({stats['copied_bytes']} bytes)")
+    for bucket in sorted(stats['buckets']):
+        entry = stats['buckets'][bucket]
+        print(f"  {bucket}: {entry['files']} files, {entry['bytes']} bytes")
+    for extension in sorted(stats['extensions']):
+        entry = stats['extensions'][extension]
+        print(f"  {extension}: {entry['files']} files, {entry['bytes']} bytes")
+    print(f"Total files failed: {stats['failed']} ({stats['failed_bytes']} bytes)")
+    print(f"Total files skipped: {stats['scanned'] - stats['copied'] - stats['failed']}")
+
+def file_size(file_path):
     try:
-        total_files_before = count_files(source_folder)
+        return os.path.getsize(file_path)
+    except OSError:
+        return 0
 
+def organize_file(file_path, source_folder, destination_folder, dimensions=None):
+    if is_image_file(file_path):
+        bucket = get_image_bucket(file_path, dimensions)
+    else:
+        bucket = get_video_bucket(file_path)
+
+    relative_path = os.path.relpath(file_path, source_folder)
+    destination_path = os.path.join(destination_folder, bucket, relative_path)
+    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
+    shutil.copy(file_path, destination_path)
+    return destination_path, bucket, None
+
+def detect_and_copy_images(source_folder, destination_folder, profiler=None):
+    results = ResultSet(stats=new_organize_stats())
+    stats = results.stats
+    header_dimensions = {}
+    job = lambda path: organize_file(path, source_folder, destination_folder, header_dimensions.get(path))
+    if profiler is not None:
+        job = profiler.wrap(job)
+    try:
+        # os.walk silently yields nothing for a missing folder.
+        if not os.path.isdir(source_folder):
+            raise FileNotFoundError(f"Source folder not found: {source_folder}")
         os.makedirs(os.path.join(destination_folder, 'landscape_images'), exist_ok=True)
         os.makedirs(os.path.join(destination_folder, 'portrait_images'), exist_ok=True)
         os.makedirs(os.path.join(destination_folder, 'square_images'), exist_ok=True)
+        os.makedirs(os.path.join(destination_folder, 'landscape_videos'), exist_ok=True)
+        os.makedirs(os.path.join(destination_folder, 'portrait_videos'), exist_ok=True)
+        os.makedirs(os.path.join(destination_folder, 'square_videos'), exist_ok=True)
         os.makedirs(os.path.join(destination_folder, 'videos'), exist_ok=True)
 
-        total_copied = 0
+        destination_real = os.path.realpath(destination_folder)
+
+        for root, dirs, files in os.walk(source_folder):
+            # Never descend into the destination when it lives inside the source.
+            dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(root, d)) != destination_real]
+
+            # Read this folder's image headers together so the reads overlap
+            # instead of queueing behind each copy. Failed reads come back as
+            # None and are retried by the job, which records the error.
+            image_paths = [os.path.join(root, filename) for filename in files if is_image_file(filename)]
+            header_dimensions.clear()
+            if len(image_paths) > 1:
+                header_dimensions.update(zip(image_paths, get_image_dimensions_batch(image_paths)))
 
-        for root, _, files in os.walk(source_folder):
             for filename in files:
                 file_path = os.path.join(root, filename)
-
-                if is_image_file(file_path):
-                    if is_landscape_image(file_path):
-                        destination_subfolder = os.path.join(destination_folder, 'landscape_images')
-                    elif is_portrait_image(file_path):
-                        destination_subfolder = os.path.join(destination_folder, 'portrait_images')
-                    elif is_square_image(file_path):
-                        destination_subfolder = os.path.join(destination_folder, 'square_images')
-                    else:
-                        continue
-
-                    relative_path = os.path.relpath(file_path, source_folder)
-                    destination_path = os.path.join(destination_subfolder, relative_path)
-                    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
-                    shutil.copy(file_path, destination_path)
-                    total_copied += 1
-
-                elif is_video_file(file_path):
-                    relative_path = os.path.relpath(file_path, source_folder)
-                    destination_path = os.path.join(destination_folder, 'videos', relative_path)
-                    os.makedirs(os.path.dirname(destination_path), exist_ok=True)
-                    shutil.copy(file_path, destination_path)
-                    total_copied += 1
-
-        total_files_after = count_files(destination_folder)
-
-        print(f"Total files before organizing: {total_files_before}")
-        print(f"Total files copied to new folders: {total_copied}")
-        print(f"Total files after organizing: {total_files_after}")
-
-        print("Images and videos organized successfully!")
+                size = file_size(file_path)
+                stats['scanned'] += 1
+                stats['scanned_bytes'] += size
+
+                if not is_image_file(file_path) and not is_video_file(file_path):
+                    continue
+
+                result = run_file(job, file_path, size)
+                results.append(result)
+                if result.ok:
+                    record_copy(stats, result.action, file_path, size)
+                else:
+                    record_failure(stats, size)
+
+        print_organize_stats(stats)
+
+        if results.failed:
+            print(f"Images and videos organized with {len(results.failed)} errors")
+        else:
+            print("Images and videos organized successfully!")
     except Exception as e:
+        results.error = f"{type(e).__name__}: {e}"
         print(f"Error while organizing images and videos: {e}")
+    return results
+
+def watch_and_organize(source_folder, destination_folder, workers=1, stop_event=None, profiler=None):
+    for bucket in ('landscape_images', 'portrait_images', 'square_images',
+                   'landscape_videos', 'portrait_videos', 'square_videos', 'videos'):
+        os.makedirs(os.path.join(destination_folder, bucket), exist_ok=True)
+
+    job = lambda path: organize_file(path, source_folder, destination_folder)
+    if profiler is not None:
+        job = profiler.wrap(job)
+
+    def process(path):
+        result = run_file(job, path)
+        if result.ok:
+            print(f"{os.path.relpath(path, source_folder)}: {result.action}")
+
+    print(f"Watching {source_folder} for new images and videos (Ctrl+C to stop)")
+    watch_folder(source_folder, process, accept=lambda path: is_image_file(path) or is_video_file(path),
+                 recursive=True, exclude=destination_folder, workers=workers, stop_event=stop_event)
 
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Organize images and videos by orientation and type')
     parser.add_argument('source_folder', help='Source folder containing images and videos')
     parser.add_argument('destination_folder', help='Destination folder for organized files')
+    parser.add_argument('--watch', action='store_true', help='Keep running and organize new or changed files as they arrive')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parallel workers in watch mode (default: 1)')
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
-    detect_and_copy_images(args.source_folder, args.destination_folder)
+    profiler = profiler_from_args(args)
+    with profiler.run():
+        if args.watch:
+            try:
+                watch_and_organize(args.source_folder, args.destination_folder, args.workers, profiler=profiler)
+            except KeyboardInterrupt:
+                pass
+        else:
+            detect_and_copy_images(args.source_folder, args.destination_folder, profiler)
 
 if __name__ == "__main__":
     main()
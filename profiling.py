@@ -0,0 +1,210 @@
+import cProfile
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+def add_profiling_arguments(parser):
+    parser.add_argument('--profile-cpu', metavar='FILE', default=None, help='Write cProfile stats for the run to FILE (read with python -m pstats FILE)')
+    parser.add_argument('--profile-mem', metavar='FILE', default=None, help='Write a tracemalloc allocation summary for the run to FILE')
+    parser.add_argument('--profile-every', metavar='N', type=int, default=1, help='Only profile every Nth file to keep overhead low (default: 1, the whole run)')
+    parser.add_argument('--profile-top', metavar='N', type=int, default=25, help='Number of allocation sites in the memory summary (default: 25)')
+
+def profiler_from_args(args):
+    return RunProfiler(args.profile_cpu, args.profile_mem, args.profile_every, args.profile_top)
+
+class RunProfiler:
+    def __init__(self, cpu_file=None, mem_file=None, every=1, top=25):
+        self.cpu_file = cpu_file
+        self.mem_file = mem_file
+        self.every = max(every, 1)
+        self.top = top
+        self.calls = 0
+        self.sampled = 0
+        self.wall_time = 0.0
+        self.peak_memory = 0
+        self.file_peaks = []
+        self.allocations = {}
+        self._lock = threading.Lock()
+        self._gate = threading.Condition()
+        self._running = 0
+        self._exclusive = False
+        self._local = threading.local()
+        self._profiles = []
+        self._owner = None
+
+    @property
+    def enabled(self):
+        return bool(self.cpu_file or self.mem_file)
+
+    def _thread_profile(self):
+        # cProfile hooks a single thread, so every thread that runs profiled
+        # work gets its own Profile; they are merged when the run ends.
+        profile = getattr(self._local, 'profile', None)
+        if profile is None:
+            profile = self._local.profile = cProfile.Profile()
+            with self._lock:
+                self._profiles.append(profile)
+        return profile
+
+    def _run_with_cpu_profile(self, job, path):
+        profile = self._thread_profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is active (on Python 3.12+ the whole-run
+            # profile already covers every thread).
+            return job(path)
+        try:
+            return job(path)
+        finally:
+            profile.disable()
+
+    def _run_shared(self, job, path):
+        # Unsampled jobs run side by side, but never while a file is traced.
+        with self._gate:
+            while self._exclusive:
+                self._gate.wait()
+            self._running += 1
+        try:
+            return job(path)
+        finally:
+            with self._gate:
+                self._running -= 1
+                self._gate.notify_all()
+
+    def _run_with_memory_trace(self, job, path):
+        # tracemalloc is process-wide: anything else running would be counted
+        # against this file, so other jobs are drained and held back first.
+        with self._gate:
+            while self._exclusive:
+                self._gate.wait()
+            self._exclusive = True
+            while self._running:
+                self._gate.wait()
+        try:
+            tracemalloc.start()
+            try:
+                if self.cpu_file:
+                    return self._run_with_cpu_profile(job, path)
+                return job(path)
+            finally:
+                snapshot = tracemalloc.take_snapshot()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.file_peaks.append((peak, path))
+                self.peak_memory = max(self.peak_memory, peak)
+                self._add_allocations(snapshot)
+        finally:
+            with self._gate:
+                self._exclusive = False
+                self._gate.notify_all()
+
+    def _add_allocations(self, snapshot):
+        for stat in snapshot.statistics('lineno'):
+            key = str(stat.traceback)
+            size, count = self.allocations.get(key, (0, 0))
+            self.allocations[key] = (size + stat.size, count + stat.count)
+
+    def wrap(self, job):
+        if not self.enabled:
+            return job
+
+        def profiled_job(path):
+            if self.every == 1:
+                # Whole-run mode: the thread that started the run is already
+                # profiled; only worker threads need their own profile.
+                if not self.cpu_file or threading.get_ident() == self._owner:
+                    return job(path)
+                return self._run_with_cpu_profile(job, path)
+
+            with self._lock:
+                self.calls += 1
+                sampled = (self.calls - 1) % self.every == 0
+                if sampled:
+                    self.sampled += 1
+            if not sampled:
+                return self._run_shared(job, path) if self.mem_file else job(path)
+            if self.mem_file:
+                return self._run_with_memory_trace(job, path)
+            return self._run_with_cpu_profile(job, path)
+
+        return profiled_job
+
+    @contextmanager
+    def run(self):
+        if not self.enabled:
+            yield self
+            return
+
+        whole_run = self.every == 1
+        profile = None
+        if whole_run:
+            self._owner = threading.get_ident()
+            if self.mem_file:
+                tracemalloc.start()
+            if self.cpu_file:
+                profile = self._thread_profile()
+                profile.enable()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_time = time.perf_counter() - start
+            if profile is not None:
+                profile.disable()
+            if whole_run and self.mem_file:
+                snapshot = tracemalloc.take_snapshot()
+                self.peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self._add_allocations(snapshot)
+            self.dump()
+
+    def dump(self):
+        if self.cpu_file:
+            self.dump_cpu()
+        if self.mem_file:
+            self.dump_memory()
+
+    def dump_cpu(self):
+        stats = None
+        for profile in self._profiles:
+            try:
+                if stats is None:
+                    stats = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+            except TypeError:
+                # Profiles that never ran anything have no stats to merge.
+                continue
+        if stats is None:
+            print("CPU profile: no files were profiled")
+            return
+        stats.dump_stats(self.cpu_file)
+        print(f"CPU profile written to {self.cpu_file} (python -m pstats {self.cpu_file})")
+
+    def describe_scope(self):
+        if self.every == 1:
+            return f"whole run, {self.wall_time:.2f}s"
+        return f"{self.sampled} of {self.calls} files sampled (every {self.every}), {self.wall_time:.2f}s"
+
+    def dump_memory(self):
+        lines = [f"Memory profile ({self.describe_scope()})",
+                 f"Peak traced memory: {self.peak_memory} bytes", ""]
+        if self.file_peaks:
+            lines.append(f"Top {min(self.top, len(self.file_peaks))} sampled files by peak memory:")
+            for peak, path in sorted(self.file_peaks, reverse=True)[:self.top]:
+                lines.append(f"  {peak:>12} bytes  {path}")
+            lines.append("")
+        held = "at the end of each sampled file" if self.every > 1 else "at the end of the run"
+        if not self.allocations:
+            lines.append(f"No allocation sites still held {held}.")
+        else:
+            lines.append(f"Top {min(self.top, len(self.allocations))} allocation sites still held {held}:")
+        top_sites = sorted(self.allocations.items(), key=lambda item: item[1][0], reverse=True)[:self.top]
+        for site, (size, count) in top_sites:
+            lines.append(f"  {size:>12} bytes  {count:>8} blocks  {site}")
+        with open(self.mem_file, 'w') as f:
+            f.write("\n".join(lines) + "\n")
+        print(f"Memory profile written to {self.mem_file}")
@@ -1,45 +1,95 @@
 from PIL import Image
 import os
 import argparse
+from scheduler import run_jobs, print_scheduler_stats
+from results import ResultSet, run_file
+from watch import watch_image_folder
+from normalize import normalize_image, widen_palette
+from profiling import add_profiling_arguments, profiler_from_args
+from metadata import (METADATA_POLICIES, convert_to_srgb, metadata_save_options,
+                      new_metadata_stats, print_metadata_stats, record_metadata)
 
-def resize_images_fixed_resolution(input_dir, output_dir, width, height, quality=85, optimize=True):
+def resize_image(input_path, output_dir, width, height, quality=85, optimize=True, background=None,
+                 metadata='icc-only', convert_srgb=False, metadata_stats=None):
+    img = Image.open(input_path)
+    source_info = dict(img.info)
+    img = widen_palette(img)
+    converted = False
+    if convert_srgb:
+        img, converted = convert_to_srgb(img)
+
+    original_width, original_height = img.size
+    aspect_ratio = original_width / original_height
+
+    if aspect_ratio > (width / height):
+        new_width = width
+        new_height = int(width / aspect_ratio)
+    else:
+        new_height = height
+        new_width = int(height * aspect_ratio)
+
+    img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    filename = os.path.basename(input_path)
+    file_ext = filename.lower().split('.')[-1]
+    base_name = filename.rsplit('.', 1)[0]
+
+    if file_ext in ['jpg', 'jpeg']:
+        output_path = os.path.join(output_dir, f"{base_name}_resized.jpg")
+        options, removed = metadata_save_options(img.info, metadata, source_info, 'JPEG')
+        img = normalize_image(img, 'JPEG', background)
+        img.save(output_path, format='JPEG', optimize=optimize, quality=quality, **options)
+    else:
+        output_path = os.path.join(output_dir, f"{base_name}_resized.png")
+        options, removed = metadata_save_options(img.info, metadata, source_info, 'PNG')
+        img = normalize_image(img, 'PNG', background)
+        img.save(output_path, format='PNG', optimize=optimize, **options)
+    record_metadata(metadata_stats, removed, converted)
+    return output_path, 'resized', (new_width, new_height)
+
+def resize_images_fixed_resolution(input_dir, output_dir, width, height, quality=85, optimize=True, workers=1,
+                                   background=None, metadata='icc-only', convert_srgb=False, profiler=None):
+    results = ResultSet()
+    metadata_stats = new_metadata_stats(metadata)
     try:
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
 
         file_list = os.listdir(input_dir)
+        input_paths = []
 
         for filename in file_list:
             input_path = os.path.join(input_dir, filename)
 
             if os.path.isfile(input_path) and filename.lower().endswith(('.png', '.jpg', '.jpeg')):
-                img = Image.open(input_path)
-                
-                original_width, original_height = img.size
-                aspect_ratio = original_width / original_height
-                
-                if aspect_ratio > (width / height):
-                    new_width = width
-                    new_height = int(width / aspect_ratio)
-                else:
-                    new_height = height
-                    new_width = int(height * aspect_ratio)
-                
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                
-                file_ext = filename.lower().split('.')[-1]
-                base_name = filename.rsplit('.', 1)[0]
-                
-                if file_ext in ['jpg', 'jpeg']:
-                    output_path = os.path.join(output_dir, f"{base_name}_resized.jpg")
-                    img.save(output_path, format='JPEG', optimize=optimize, quality=quality)
-                else:
-                    output_path = os.path.join(output_dir, f"{base_name}_resized.png")
-                    img.save(output_path, format='PNG', optimize=optimize)
-
-        print("Image resizing with fixed resolution successful!")
+                input_paths.append(input_path)
+
+        job = lambda path: resize_image(path, output_dir, width, height, quality, optimize, background,
+                                        metadata, convert_srgb, metadata_stats)
+        if profiler is not None:
+            job = profiler.wrap(job)
+        file_results, results.stats = run_jobs(lambda path: run_file(job, path), input_paths, workers)
+        results.extend(file_results)
+        results.stats['metadata'] = metadata_stats
+        if workers > 1:
+            print_scheduler_stats(results.stats)
+        print_metadata_stats(metadata_stats)
+
+        if results.failed:
+            print(f"Image resizing finished with {len(results.failed)} errors")
+        else:
+            print("Image resizing with fixed resolution successful!")
     except Exception as e:
+        results.error = f"{type(e).__name__}: {e}"
         print(f"Error during image resizing with fixed resolution: {e}")
+    return results
+
+def watch_and_resize(input_dir, output_dir, width, height, quality=85, optimize=True, workers=1, stop_event=None,
+                     background=None, metadata='icc-only', convert_srgb=False, profiler=None):
+    job = lambda path: resize_image(path, output_dir, width, height, quality, optimize, background, metadata, convert_srgb)
+    if profiler is not None:
+        job = profiler.wrap(job)
+    watch_image_folder(input_dir, output_dir, job, workers, stop_event)
 
 def main():
     parser = argparse.ArgumentParser(description='Resize images while maintaining aspect ratio')
@@ -50,9 +100,26 @@ def main():
     parser.add_argument('--quality', type=int, default=85, help='JPEG quality (1-100, default: 85)')
     parser.add_argument('--optimize', action='store_true', default=True, help='Optimize images (default: True)')
     parser.add_argument('--no-optimize', dest='optimize', action='store_false', help='Disable optimization')
+    parser.add_argument('--workers', type=int, default=1, help='Number of parallel workers, largest files first (default: 1)')
+    parser.add_argument('--watch', action='store_true', help='Keep running and resize new or changed images as they arrive')
+    parser.add_argument('--background', default=None, help='Flatten transparency onto this color, e.g. white or #f0f0f0 (JPEG outputs always use white by default)')
+    parser.add_argument('--metadata', choices=METADATA_POLICIES, default='icc-only', help='Which metadata to carry over: strip all, keep EXIF/XMP/ICC, or keep only the ICC profile (default: icc-only)')
+    parser.add_argument('--convert-srgb', action='store_true', help='Convert images with a non-sRGB ICC profile to sRGB')
+    add_profiling_arguments(parser)
     
     args = parser.parse_args()
-    resize_images_fixed_resolution(args.input_dir, args.output_dir, args.width, args.height, args.quality, args.optimize)
+    profiler = profiler_from_args(args)
+    with profiler.run():
+        if args.watch:
+            try:
+                watch_and_resize(args.input_dir, args.output_dir, args.width, args.height, args.quality, args.optimize, args.workers,
+                                 background=args.background, metadata=args.metadata, convert_srgb=args.convert_srgb,
+                                 profiler=profiler)
+            except KeyboardInterrupt:
+                pass
+        else:
+            resize_images_fixed_resolution(args.input_dir, args.output_dir, args.width, args.height, args.quality, args.optimize,
+                                           args.workers, args.background, args.metadata, args.convert_srgb, profiler)
 
 if __name__ == "__main__":
     main()
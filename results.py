@@ -0,0 +1,96 @@
+import os
+import time
+
+class FileResult:
+    # Slots keep each record to a fixed handful of references, so a result
+    # set for a million-file run stays small.
+    __slots__ = ('input_path', 'output_path', 'status', 'action', 'detail',
+                 'input_bytes', 'output_bytes', 'elapsed', 'error')
+
+    def __init__(self, input_path, output_path=None, status='ok', action=None, detail=None,
+                 input_bytes=0, output_bytes=0, elapsed=0.0, error=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.status = status
+        self.action = action
+        self.detail = detail
+        self.input_bytes = input_bytes
+        self.output_bytes = output_bytes
+        self.elapsed = elapsed
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.status == 'ok'
+
+    def __repr__(self):
+        return (f"FileResult({self.input_path!r}, status={self.status!r}, action={self.action!r}, "
+                f"output_path={self.output_path!r}, error={self.error!r})")
+
+class ResultSet:
+    # ``error`` is set when the run itself failed (for example a missing
+    # input folder), as opposed to individual files.
+    __slots__ = ('results', 'stats', 'error')
+
+    def __init__(self, results=None, stats=None, error=None):
+        self.results = results if results is not None else []
+        self.stats = stats if stats is not None else {}
+        self.error = error
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def __getitem__(self, index):
+        return self.results[index]
+
+    def append(self, result):
+        self.results.append(result)
+
+    def extend(self, results):
+        self.results.extend(results)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.ok]
+
+    @property
+    def failed(self):
+        return [result for result in self.results if not result.ok]
+
+    def summary(self):
+        failed = sum(1 for result in self.results if not result.ok)
+        return {
+            'status': 'ok' if self.ok else 'error',
+            'error': self.error,
+            'files': len(self.results),
+            'succeeded': len(self.results) - failed,
+            'failed': failed,
+            'input_bytes': sum(result.input_bytes for result in self.results),
+            'output_bytes': sum(result.output_bytes for result in self.results if result.ok),
+            'elapsed': sum(result.elapsed for result in self.results),
+        }
+
+def run_file(job, input_path, input_bytes=None):
+    # Jobs return (output_path, action, detail); any exception is recorded on
+    # the result instead of aborting the rest of the batch.
+    start = time.perf_counter()
+    result = FileResult(input_path)
+    try:
+        if input_bytes is None:
+            input_bytes = os.path.getsize(input_path)
+        result.input_bytes = input_bytes
+        result.output_path, result.action, result.detail = job(input_path)
+        result.output_bytes = os.path.getsize(result.output_path)
+    except Exception as e:
+        result.status = 'error'
+        result.error = f"{type(e).__name__}: {e}"
+        print(f"Error processing {input_path}: {e}")
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,81 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from image_headers import get_image_dimensions_batch
+
+def file_cost(file_path, dimensions):
+    # Decode and encode time grow with the pixel count; the file size adds
+    # the entropy-coding work and stands in when the header is unreadable.
+    try:
+        size = os.path.getsize(file_path)
+    except OSError:
+        return 0
+    if dimensions is None:
+        return size
+    width, height = dimensions
+    return width * height + size
+
+def order_by_cost(file_paths, workers=None):
+    # The headers are read on a thread pool so the pre-pass does not queue
+    # every read before the first job can start.
+    dimensions = get_image_dimensions_batch(file_paths, workers)
+    costs = {file_path: file_cost(file_path, file_dimensions)
+             for file_path, file_dimensions in zip(file_paths, dimensions)}
+    # Longest processing time first: the big jobs start while every worker is
+    # still free, and the small ones fill in the gaps at the end.
+    return sorted(file_paths, key=lambda file_path: costs[file_path], reverse=True)
+
+def new_scheduler_stats(workers):
+    return {
+        'workers': workers,
+        'ordering_time': 0.0,
+        'wall_time': 0.0,
+        'busy_time': {},
+        'jobs': {},
+        'utilization': 0.0,
+    }
+
+def run_jobs(job, file_paths, workers=1):
+    stats = new_scheduler_stats(workers)
+    worker_ids = {}
+    lock = threading.Lock()
+
+    def timed_job(file_path):
+        ident = threading.get_ident()
+        with lock:
+            worker = worker_ids.setdefault(ident, len(worker_ids))
+        start = time.perf_counter()
+        try:
+            return job(file_path)
+        finally:
+            elapsed = time.perf_counter() - start
+            with lock:
+                stats['busy_time'][worker] = stats['busy_time'].get(worker, 0.0) + elapsed
+                stats['jobs'][worker] = stats['jobs'].get(worker, 0) + 1
+
+    if workers <= 1:
+        start = time.perf_counter()
+        results = [timed_job(file_path) for file_path in file_paths]
+    else:
+        # Workers sit idle while the costs are read, so the pre-pass is timed
+        # on its own and kept out of the utilization figures.
+        start = time.perf_counter()
+        ordered = order_by_cost(file_paths, workers)
+        stats['ordering_time'] = time.perf_counter() - start
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {file_path: executor.submit(timed_job, file_path) for file_path in ordered}
+            results = [futures[file_path].result() for file_path in file_paths]
+    stats['wall_time'] = time.perf_counter() - start
+
+    capacity = stats['wall_time'] * max(workers, 1)
+    if capacity > 0:
+        stats['utilization'] = sum(stats['busy_time'].values()) / capacity
+    return results, stats
+
+def print_scheduler_stats(stats):
+    print(f"Workers: {stats['workers']}, ordering: {stats['ordering_time']:.2f}s, "
+          f"wall time: {stats['wall_time']:.2f}s, utilization: {stats['utilization'] * 100:.1f}%")
+    for worker in sorted(stats['busy_time']):
+        print(f"  worker {worker}: {stats['jobs'][worker]} files, busy {stats['busy_time'][worker]:.2f}s")
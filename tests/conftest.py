@@ -5,6 +5,7 @@ import pytest
 import os
 import tempfile
 import shutil
+import struct
 from PIL import Image
 
 
@@ -73,3 +74,86 @@ def empty_directory(temp_dir):
     """Create an empty temporary directory."""
     return temp_dir
 
+
+def build_box(box_type, payload):
+    """Build an ISO base media box with a 32-bit size header."""
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def build_tkhd(width, height, rotate=False, version=0):
+    """Build a 'tkhd' box for a track of the given display size."""
+    times = b'\x00' * (32 if version == 1 else 20)
+    if rotate:
+        matrix = (0, 0x10000, 0, -0x10000, 0, 0, 0, 0, 0x40000000)
+    else:
+        matrix = (0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    payload = bytes([version, 0, 0, 7]) + times + b'\x00' * 16
+    payload += struct.pack('>9i', *matrix)
+    payload += struct.pack('>II', width << 16, height << 16)
+    return build_box(b'tkhd', payload)
+
+
+@pytest.fixture
+def make_video(temp_dir):
+    """Return a factory that writes a minimal MP4 with one audio and one video track."""
+    def _make_video(name, width, height, rotate=False, version=0, mdat_size=4096):
+        audio_track = build_box(b'trak', build_tkhd(0, 0))
+        video_track = build_box(b'trak', build_tkhd(width, height, rotate, version))
+        video_path = os.path.join(temp_dir, name)
+        with open(video_path, 'wb') as f:
+            f.write(build_box(b'ftyp', b'isom\x00\x00\x02\x00'))
+            f.write(build_box(b'mdat', b'\x00' * mdat_size))
+            f.write(build_box(b'moov', audio_track + video_track))
+        return video_path
+    return _make_video
+
+
+def build_rgb_icc_profile(description, primaries, gamma=2.2):
+    """Build a minimal ICC v2 matrix/TRC RGB display profile."""
+    def s15f16(value):
+        return struct.pack('>i', int(round(value * 65536)))
+
+    def xyz_tag(xyz):
+        return b'XYZ \x00\x00\x00\x00' + b''.join(s15f16(v) for v in xyz)
+
+    ascii_text = description.encode('ascii') + b'\x00'
+    desc = (b'desc\x00\x00\x00\x00' + struct.pack('>I', len(ascii_text)) + ascii_text
+            + b'\x00' * 8 + b'\x00' * 3 + b'\x00' * 67)
+    curve = b'curv\x00\x00\x00\x00' + struct.pack('>IH', 1, int(round(gamma * 256))) + b'\x00\x00'
+    white = (0.9642, 1.0, 0.8249)
+    tags = [(b'desc', desc), (b'wtpt', xyz_tag(white)),
+            (b'rXYZ', xyz_tag(primaries[0])), (b'gXYZ', xyz_tag(primaries[1])), (b'bXYZ', xyz_tag(primaries[2])),
+            (b'rTRC', curve), (b'gTRC', curve), (b'bTRC', curve)]
+
+    offset = 128 + 4 + 12 * len(tags)
+    table = struct.pack('>I', len(tags))
+    data = b''
+    for signature, payload in tags:
+        payload += b'\x00' * (-len(payload) % 4)
+        table += signature + struct.pack('>II', offset + len(data), len(payload))
+        data += payload
+
+    size = offset + len(data)
+    header = (struct.pack('>I', size) + b'\x00' * 4 + struct.pack('>I', 0x02100000)
+              + b'mntrRGB XYZ ' + b'\x00' * 12 + b'acsp' + b'\x00' * 24
+              + struct.pack('>I', 0) + b''.join(s15f16(v) for v in white) + b'\x00' * 48)
+    return header + table + data
+
+
+@pytest.fixture
+def wide_gamut_profile():
+    """Return ICC profile bytes for an Adobe RGB-like (non-sRGB) color space."""
+    return build_rgb_icc_profile(
+        "Wide Gamut Test RGB",
+        [(0.6097, 0.3111, 0.0195), (0.2053, 0.6257, 0.0609), (0.1492, 0.0632, 0.7446)],
+    )
+
+
+@pytest.fixture
+def linear_srgb_profile():
+    """Return ICC profile bytes with sRGB primaries but a linear tone curve."""
+    return build_rgb_icc_profile(
+        "Linear sRGB",
+        [(0.4361, 0.2225, 0.0139), (0.3851, 0.7169, 0.0971), (0.1431, 0.0606, 0.7141)],
+        gamma=1.0,
+    )
@@ -16,7 +16,12 @@ import sys
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from compress_images import compress_images_in_directory
+from compress_images import (
+    compress_images_in_directory,
+    compress_image,
+    estimate_jpeg_quality,
+    strip_jpeg_metadata
+)
 
 
 class TestCompressImages:
@@ -145,3 +150,107 @@ class TestCompressImages:
         output_file = os.path.join(output_dir, "test_image_compressed.jpg")
         assert os.path.exists(output_file), "File should be created even with extreme quality values"
 
+
+    def test_parallel_workers(self, temp_dir, sample_image_jpeg, sample_image_png):
+        """Test that compressing with several workers produces every output."""
+        output_dir = os.path.join(temp_dir, "output")
+        compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True, workers=2)
+
+        assert sorted(os.listdir(output_dir)) == ["test_image_compressed.jpg", "test_image_compressed.png"]
+
+    def test_returns_per_file_results(self, temp_dir, sample_image_jpeg, sample_image_png):
+        """Test that the function returns one result per processed image."""
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True)
+
+        assert len(results) == 2
+        assert all(result.ok for result in results)
+        for result in results:
+            assert os.path.getsize(result.output_path) == result.output_bytes
+            assert os.path.getsize(result.input_path) == result.input_bytes
+
+    def test_bad_file_does_not_abort_batch(self, temp_dir, sample_image_jpeg, sample_image_png):
+        """Test that a corrupted image is reported and the rest are still compressed."""
+        fake_image = os.path.join(temp_dir, "fake.jpg")
+        with open(fake_image, 'w') as f:
+            f.write("This is not a real image")
+
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True)
+
+        assert len(results.succeeded) == 2, "Valid images should still be compressed"
+        assert [r.input_path for r in results.failed] == [fake_image]
+        assert results.failed[0].error is not None
+
+    def test_missing_input_directory_is_recorded(self, temp_dir):
+        """Test that a missing input folder is reported on the results, not just printed."""
+        results = compress_images_in_directory(os.path.join(temp_dir, "nope"), os.path.join(temp_dir, "output"),
+                                               quality=50, optimize=True)
+        assert not results.ok
+        assert results.error.startswith("FileNotFoundError")
+        assert len(results) == 0
+
+
+class TestLosslessJpegPath:
+    """Test suite for quality estimation and the lossless JPEG path."""
+
+    @pytest.mark.parametrize("quality", [10, 30, 50, 75, 85, 95])
+    def test_estimate_jpeg_quality(self, temp_dir, quality):
+        """Test that the estimate recovers the IJG quality a JPEG was saved with."""
+        img_path = os.path.join(temp_dir, "source.jpg")
+        Image.new('RGB', (64, 64), color='red').save(img_path, format='JPEG', quality=quality)
+
+        with Image.open(img_path) as img:
+            assert abs(estimate_jpeg_quality(img) - quality) <= 1
+
+    def test_estimate_quality_non_jpeg(self, sample_image_png):
+        """Test that images without quantization tables have no estimate."""
+        with Image.open(sample_image_png) as img:
+            assert estimate_jpeg_quality(img) is None
+
+    def test_lower_quality_reencodes(self, temp_dir, sample_image_jpeg):
+        """Test that a quality below the source estimate re-encodes."""
+        output_dir = os.path.join(temp_dir, "output")
+        os.makedirs(output_dir)
+        output_path, action, source_quality = compress_image(sample_image_jpeg, output_dir, 50, True)
+
+        assert action == 'reencoded'
+        assert source_quality == 95
+        assert os.path.getsize(output_path) < os.path.getsize(sample_image_jpeg)
+
+    def test_higher_quality_copies_original(self, temp_dir, sample_image_jpeg):
+        """Test that a quality at or above the source estimate copies the original bytes."""
+        output_dir = os.path.join(temp_dir, "output")
+        os.makedirs(output_dir)
+        output_path, action, _ = compress_image(sample_image_jpeg, output_dir, 95, True)
+
+        assert action == 'copied'
+        with open(sample_image_jpeg, 'rb') as src, open(output_path, 'rb') as dst:
+            assert src.read() == dst.read(), "Output should be identical to the source"
+
+    def test_higher_quality_strips_metadata(self, temp_dir):
+        """Test that metadata is stripped losslessly instead of re-encoding."""
+        img_path = os.path.join(temp_dir, "exif.jpg")
+        exif = Image.Exif()
+        exif[0x010E] = "x" * 5000  # ImageDescription
+        Image.new('RGB', (200, 100), color='red').save(img_path, format='JPEG', quality=80, exif=exif)
+
+        output_dir = os.path.join(temp_dir, "output")
+        os.makedirs(output_dir)
+        output_path, action, _ = compress_image(img_path, output_dir, 90, True)
+
+        assert action == 'stripped'
+        assert os.path.getsize(output_path) < os.path.getsize(img_path) - 5000
+        with Image.open(img_path) as original, Image.open(output_path) as stripped:
+            assert 'exif' not in stripped.info
+            assert original.tobytes() == stripped.tobytes(), "Pixels should be unchanged"
+
+    def test_strip_keeps_jfif_and_scan_data(self, sample_image_jpeg):
+        """Test that stripping a metadata-free JPEG leaves it unchanged."""
+        with open(sample_image_jpeg, 'rb') as f:
+            data = f.read()
+        assert strip_jpeg_metadata(data) == data
+
+    def test_strip_rejects_non_jpeg(self):
+        """Test that non-JPEG data is not stripped."""
+        assert strip_jpeg_metadata(b"not a jpeg") is None
@@ -0,0 +1,110 @@
+"""
+Tests for image_headers.py module.
+
+This test suite covers:
+- Header-only dimension reading for JPEG, PNG, GIF and WebP
+- JPEG SOF scanning past large APPn segments
+- Pillow fallback for unusual formats
+- Batched dimension extraction
+- Error handling for corrupted files
+"""
+import os
+import pytest
+from PIL import Image
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from image_headers import (
+    get_image_dimensions,
+    get_image_dimensions_batch,
+    jpeg_dimensions,
+    read_dimensions
+)
+
+
+def fast_dimensions(image_path):
+    """Read dimensions without the Pillow fallback."""
+    fd = os.open(image_path, os.O_RDONLY)
+    try:
+        return read_dimensions(fd)
+    finally:
+        os.close(fd)
+
+
+class TestHeaderReaders:
+    """Test suite for the per-format header parsers."""
+
+    def test_jpeg_dimensions(self, sample_image_jpeg):
+        """Test reading JPEG dimensions from the SOF marker."""
+        assert fast_dimensions(sample_image_jpeg) == (800, 600)
+
+    def test_progressive_jpeg_dimensions(self, temp_dir):
+        """Test reading a progressive JPEG (SOF2)."""
+        img_path = os.path.join(temp_dir, "progressive.jpg")
+        Image.new('RGB', (321, 123), color='red').save(img_path, format='JPEG', progressive=True)
+        assert fast_dimensions(img_path) == (321, 123)
+
+    def test_jpeg_with_large_exif(self, temp_dir):
+        """Test that the SOF marker is found behind a large EXIF segment."""
+        img_path = os.path.join(temp_dir, "exif.jpg")
+        exif = Image.Exif()
+        exif[0x010E] = "x" * 60000  # ImageDescription
+        Image.new('RGB', (640, 480), color='red').save(img_path, format='JPEG', exif=exif)
+        assert fast_dimensions(img_path) == (640, 480)
+
+    def test_png_dimensions(self, sample_image_png):
+        """Test reading PNG dimensions from IHDR."""
+        assert fast_dimensions(sample_image_png) == (600, 800)
+
+    def test_gif_dimensions(self, temp_dir):
+        """Test reading GIF logical screen dimensions."""
+        img_path = os.path.join(temp_dir, "anim.gif")
+        Image.new('P', (300, 200)).save(img_path, format='GIF')
+        assert fast_dimensions(img_path) == (300, 200)
+
+    @pytest.mark.parametrize("options", [{'lossless': False}, {'lossless': True}])
+    def test_webp_dimensions(self, temp_dir, options):
+        """Test reading lossy and lossless WebP dimensions."""
+        img_path = os.path.join(temp_dir, "image.webp")
+        Image.new('RGB', (500, 250), color='green').save(img_path, format='WEBP', **options)
+        assert fast_dimensions(img_path) == (500, 250)
+
+    def test_webp_extended_dimensions(self, temp_dir):
+        """Test reading VP8X (extended) WebP canvas dimensions."""
+        img_path = os.path.join(temp_dir, "alpha.webp")
+        Image.new('RGBA', (410, 230), color=(0, 0, 0, 0)).save(img_path, format='WEBP')
+        assert fast_dimensions(img_path) == (410, 230)
+
+    def test_truncated_jpeg_returns_none(self):
+        """Test that a JPEG without a SOF marker is not parsed."""
+        assert jpeg_dimensions(b'\xff\xd8\xff\xe0\x00\x10' + b'\x00' * 14) is None
+
+
+class TestGetImageDimensions:
+    """Test suite for the public dimension API."""
+
+    def test_falls_back_to_pillow(self, temp_dir):
+        """Test that unusual formats are handled by Pillow."""
+        img_path = os.path.join(temp_dir, "image.bmp")
+        Image.new('RGB', (123, 45)).save(img_path, format='BMP')
+        assert get_image_dimensions(img_path) == (123, 45)
+
+    def test_invalid_file_raises(self, temp_dir):
+        """Test that a corrupted file raises instead of returning bogus sizes."""
+        fake_image = os.path.join(temp_dir, "fake.jpg")
+        with open(fake_image, 'w') as f:
+            f.write("This is not a real image")
+        with pytest.raises(Exception):
+            get_image_dimensions(fake_image)
+
+    def test_batch_preserves_order(self, temp_dir, landscape_image, portrait_image, square_image):
+        """Test batched extraction returns results in input order."""
+        fake_image = os.path.join(temp_dir, "fake.png")
+        with open(fake_image, 'w') as f:
+            f.write("This is not a real image")
+
+        paths = [landscape_image, portrait_image, fake_image, square_image]
+        results = get_image_dimensions_batch(paths, max_workers=2)
+        assert results == [(1600, 800), (600, 1200), None, (1000, 1000)]
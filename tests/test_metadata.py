@@ -0,0 +1,320 @@
+"""
+Tests for metadata.py module.
+
+This test suite covers:
+- strip / keep / icc-only save options and removed byte counts
+- sRGB detection and conversion of non-sRGB ICC profiles
+- Caching of ImageCms transforms per distinct profile
+- Metadata policies in the compress and resize paths
+"""
+import os
+import pytest
+from PIL import Image, ImageCms, PngImagePlugin
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import metadata
+from metadata import (
+    convert_to_srgb,
+    metadata_save_options,
+    new_metadata_stats,
+    orientation_exif,
+    record_metadata
+)
+from compress_images import compress_images_in_directory
+from resize_aspectRatio import resize_images_fixed_resolution
+
+SRGB_PROFILE = ImageCms.ImageCmsProfile(ImageCms.createProfile('sRGB')).tobytes()
+XMP_PACKET = '<x:xmpmeta xmlns:x="adobe:ns:meta/">' + 'x' * 500 + '</x:xmpmeta>'
+
+
+def make_exif(size):
+    """Create EXIF data with a description of the given length."""
+    exif = Image.Exif()
+    exif[0x010E] = "x" * size  # ImageDescription
+    return exif
+
+
+def save_rotated_photo(path, orientation=6):
+    """Save a JPEG with a large EXIF block carrying an Orientation tag."""
+    exif = make_exif(3000)
+    exif[0x0112] = orientation
+    Image.new('RGB', (120, 80), color=(100, 150, 200)).save(path, format='JPEG', exif=exif, quality=90)
+    return path
+
+
+def save_with_metadata(path, image_format, icc_profile, exif_size=2000, color=(100, 150, 200)):
+    """Save an image carrying EXIF and an ICC profile."""
+    img = Image.new('RGB', (120, 80), color=color)
+    img.save(path, format=image_format, exif=make_exif(exif_size), icc_profile=icc_profile, quality=95)
+    return path
+
+
+class TestSaveOptions:
+    """Test suite for metadata policy save options."""
+
+    INFO = {'exif': b'e' * 100, 'xmp': b'x' * 50, 'icc_profile': b'i' * 30}
+
+    def test_strip(self):
+        """Test that strip drops everything, including the ICC profile."""
+        options, removed = metadata_save_options(self.INFO, 'strip')
+        assert options == {'icc_profile': None}
+        assert removed == 180
+
+    def test_keep(self):
+        """Test that keep carries EXIF, XMP and ICC through."""
+        options, removed = metadata_save_options(self.INFO, 'keep')
+        assert options == self.INFO
+        assert removed == 0
+
+    def test_icc_only(self):
+        """Test that icc-only keeps only the ICC profile."""
+        options, removed = metadata_save_options(self.INFO, 'icc-only')
+        assert options == {'icc_profile': b'i' * 30}
+        assert removed == 150
+
+    def test_keep_png_writes_xmp_as_itxt(self):
+        """Test that PNG output carries XMP in pnginfo, not the ignored xmp keyword."""
+        options, removed = metadata_save_options(self.INFO, 'keep', output_format='PNG')
+        assert 'xmp' not in options
+        assert isinstance(options['pnginfo'], PngImagePlugin.PngInfo)
+        assert removed == 0
+
+    def test_orientation_survives_stripping(self):
+        """Test that strip and icc-only keep a minimal EXIF with the Orientation tag."""
+        exif = make_exif(500)
+        exif[0x0112] = 6
+        info = {'exif': exif.tobytes()}
+        for policy in ('strip', 'icc-only'):
+            options, removed = metadata_save_options(info, policy)
+            kept = Image.Exif()
+            kept.load(options['exif'])
+            assert dict(kept) == {0x0112: 6}
+            assert removed == len(info['exif']) - len(options['exif'])
+
+    def test_upright_orientation_needs_no_exif(self):
+        """Test that no EXIF is kept for upright or unparseable sources."""
+        exif = make_exif(10)
+        exif[0x0112] = 1
+        assert orientation_exif(exif.tobytes()) is None
+        assert orientation_exif(make_exif(10).tobytes()) is None
+        assert orientation_exif(b'not exif') is None
+        assert orientation_exif(None) is None
+
+    def test_converted_profile_counts_as_removed(self):
+        """Test that a profile dropped by sRGB conversion counts as removed."""
+        converted_info = {'exif': self.INFO['exif']}
+        _, removed = metadata_save_options(converted_info, 'keep', self.INFO)
+        assert removed == 80
+
+    def test_record_metadata(self):
+        """Test that per-file numbers accumulate into run stats."""
+        stats = new_metadata_stats('strip')
+        record_metadata(stats, 100, converted=True)
+        record_metadata(stats, 50)
+        record_metadata(None, 10)
+        assert stats == {'policy': 'strip', 'files': 2, 'bytes_removed': 150, 'icc_converted': 1}
+
+
+class TestSrgbConversion:
+    """Test suite for ICC to sRGB conversion."""
+
+    def test_non_srgb_profile_is_converted(self, wide_gamut_profile):
+        """Test that pixels are transformed and the profile is dropped."""
+        img = Image.new('RGB', (4, 4), (100, 150, 200))
+        img.info['icc_profile'] = wide_gamut_profile
+        img.info['exif'] = b'exif'
+
+        converted, changed = convert_to_srgb(img)
+        assert changed
+        assert converted.getpixel((0, 0)) != (100, 150, 200)
+        assert converted.info == {'exif': b'exif'}
+
+    def test_srgb_profile_is_left_alone(self):
+        """Test that an image already tagged sRGB is not transformed."""
+        img = Image.new('RGB', (4, 4), (100, 150, 200))
+        img.info['icc_profile'] = SRGB_PROFILE
+        converted, changed = convert_to_srgb(img)
+        assert not changed
+        assert converted is img
+
+    def test_untagged_image_is_left_alone(self):
+        """Test that images without a profile are not transformed."""
+        img = Image.new('RGB', (4, 4))
+        assert convert_to_srgb(img) == (img, False)
+
+    def test_transform_built_once_per_profile(self, wide_gamut_profile, monkeypatch):
+        """Test that the transform is cached and reused across images."""
+        monkeypatch.setattr(metadata, '_transforms', {})
+        calls = []
+        real_build = ImageCms.buildTransform
+
+        def counting_build(*args, **kwargs):
+            calls.append(args)
+            return real_build(*args, **kwargs)
+
+        monkeypatch.setattr(ImageCms, 'buildTransform', counting_build)
+        for _ in range(3):
+            img = Image.new('RGB', (4, 4), (100, 150, 200))
+            img.info['icc_profile'] = wide_gamut_profile
+            convert_to_srgb(img)
+
+        assert len(calls) == 1, "Transform should be built once and reused"
+
+
+    def test_linear_srgb_profile_is_converted(self, linear_srgb_profile):
+        """Test that a profile named sRGB but with a linear tone curve is converted."""
+        img = Image.new('RGB', (4, 4), (128, 128, 128))
+        img.info['icc_profile'] = linear_srgb_profile
+        converted, changed = convert_to_srgb(img)
+        assert changed
+        assert converted.getpixel((0, 0))[0] > 150, "Linear mid-grey is brighter in sRGB"
+
+    def test_broken_profile_reported_once(self, monkeypatch, capsys):
+        """Test that a profile that fails to parse is cached and not retried per file."""
+        monkeypatch.setattr(metadata, '_transforms', {})
+        calls = []
+        real_profile = ImageCms.ImageCmsProfile
+
+        def counting_profile(*args, **kwargs):
+            calls.append(args)
+            return real_profile(*args, **kwargs)
+
+        monkeypatch.setattr(ImageCms, 'ImageCmsProfile', counting_profile)
+        for _ in range(3):
+            img = Image.new('RGB', (4, 4))
+            img.info['icc_profile'] = b'not an icc profile'
+            assert convert_to_srgb(img) == (img, False)
+
+        assert len(calls) == 1
+        assert capsys.readouterr().out.count("Error while building sRGB transform") == 1
+
+
+class TestMetadataInPipelines:
+    """Test suite for metadata policies in compress and resize."""
+
+    @pytest.mark.parametrize("policy, has_exif, has_icc", [
+        ('strip', False, False),
+        ('keep', True, True),
+        ('icc-only', False, True),
+    ])
+    def test_compress_png_policies(self, temp_dir, wide_gamut_profile, policy, has_exif, has_icc):
+        """Test that each policy controls what a compressed PNG carries."""
+        save_with_metadata(os.path.join(temp_dir, "photo.png"), 'PNG', wide_gamut_profile)
+        output_dir = os.path.join(temp_dir, "output")
+        compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True, metadata=policy)
+
+        output = Image.open(os.path.join(output_dir, "photo_compressed.png"))
+        assert ('exif' in output.info) == has_exif
+        assert ('icc_profile' in output.info) == has_icc
+
+    @pytest.mark.parametrize("policy, has_exif, has_icc", [
+        ('strip', False, False),
+        ('keep', True, True),
+        ('icc-only', False, True),
+    ])
+    def test_resize_jpeg_policies(self, temp_dir, wide_gamut_profile, policy, has_exif, has_icc):
+        """Test that each policy controls what a resized JPEG carries."""
+        save_with_metadata(os.path.join(temp_dir, "photo.jpg"), 'JPEG', wide_gamut_profile)
+        output_dir = os.path.join(temp_dir, "output")
+        resize_images_fixed_resolution(temp_dir, output_dir, width=60, height=40, metadata=policy)
+
+        output = Image.open(os.path.join(output_dir, "photo_resized.jpg"))
+        assert ('exif' in output.info) == has_exif
+        assert ('icc_profile' in output.info) == has_icc
+
+    def test_compress_png_keeps_xmp(self, temp_dir):
+        """Test that keep carries a PNG's XMP iTXt chunk through compression."""
+        pnginfo = PngImagePlugin.PngInfo()
+        pnginfo.add_itxt('XML:com.adobe.xmp', XMP_PACKET)
+        Image.new('RGB', (120, 80), (100, 150, 200)).save(os.path.join(temp_dir, "photo.png"), pnginfo=pnginfo)
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True, metadata='keep')
+
+        output = Image.open(os.path.join(output_dir, "photo_compressed.png"))
+        output.load()
+        assert output.info.get('xmp') == XMP_PACKET.encode()
+        assert results.stats['metadata']['bytes_removed'] == 0
+
+    def test_compress_png_strip_counts_xmp(self, temp_dir):
+        """Test that stripping a PNG's XMP is counted as removed bytes."""
+        pnginfo = PngImagePlugin.PngInfo()
+        pnginfo.add_itxt('XML:com.adobe.xmp', XMP_PACKET)
+        Image.new('RGB', (120, 80), (100, 150, 200)).save(os.path.join(temp_dir, "photo.png"), pnginfo=pnginfo)
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True, metadata='strip')
+
+        output = Image.open(os.path.join(output_dir, "photo_compressed.png"))
+        output.load()
+        assert 'xmp' not in output.info
+        assert results.stats['metadata']['bytes_removed'] == len(XMP_PACKET)
+
+    @pytest.mark.parametrize("quality, action", [(50, 'reencoded'), (100, 'stripped')])
+    def test_compress_keeps_orientation(self, temp_dir, quality, action):
+        """Test that a rotated phone photo stays rotated on both compress paths."""
+        path = save_rotated_photo(os.path.join(temp_dir, "phone.jpg"))
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=quality, optimize=True,
+                                               metadata='icc-only')
+
+        assert results[0].action == action
+        output = Image.open(results[0].output_path)
+        assert dict(output.getexif()) == {0x0112: 6}, "Only Orientation should survive"
+        assert os.path.getsize(results[0].output_path) < os.path.getsize(path)
+
+    def test_resize_keeps_orientation(self, temp_dir):
+        """Test that resizing with strip keeps the Orientation tag."""
+        save_rotated_photo(os.path.join(temp_dir, "phone.jpg"), orientation=8)
+        output_dir = os.path.join(temp_dir, "output")
+        results = resize_images_fixed_resolution(temp_dir, output_dir, width=60, height=40, metadata='strip')
+
+        output = Image.open(results[0].output_path)
+        assert output.getexif().get(0x0112) == 8
+
+    def test_compress_reports_bytes_removed(self, temp_dir, wide_gamut_profile):
+        """Test that run stats count the metadata bytes left out."""
+        path = save_with_metadata(os.path.join(temp_dir, "photo.jpg"), 'JPEG', wide_gamut_profile, exif_size=5000)
+        with Image.open(path) as img:
+            expected = len(img.info['exif']) + len(img.info['icc_profile'])
+
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=50, optimize=True, metadata='strip')
+
+        stats = results.stats['metadata']
+        assert stats['files'] == 1
+        assert stats['bytes_removed'] == expected
+
+    def test_lossless_path_honours_icc_only(self, temp_dir, wide_gamut_profile):
+        """Test that the lossless JPEG path keeps the ICC segment under icc-only."""
+        save_with_metadata(os.path.join(temp_dir, "photo.jpg"), 'JPEG', wide_gamut_profile, exif_size=5000)
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=100, optimize=True, metadata='icc-only')
+
+        assert results[0].action == 'stripped'
+        output = Image.open(os.path.join(output_dir, "photo_compressed.jpg"))
+        assert output.info.get('icc_profile') == wide_gamut_profile
+        assert 'exif' not in output.info
+        assert results.stats['metadata']['bytes_removed'] > 5000
+
+    def test_lossless_path_keep_copies(self, temp_dir, wide_gamut_profile):
+        """Test that the lossless JPEG path copies the file under keep."""
+        path = save_with_metadata(os.path.join(temp_dir, "photo.jpg"), 'JPEG', wide_gamut_profile)
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=100, optimize=True, metadata='keep')
+
+        assert results[0].action == 'copied'
+        assert os.path.getsize(results[0].output_path) == os.path.getsize(path)
+
+    def test_convert_srgb_reencodes_instead_of_lossless(self, temp_dir, wide_gamut_profile):
+        """Test that a non-sRGB JPEG is converted even when the lossless path would apply."""
+        save_with_metadata(os.path.join(temp_dir, "photo.jpg"), 'JPEG', wide_gamut_profile)
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=100, optimize=True,
+                                               metadata='icc-only', convert_srgb=True)
+
+        assert results[0].action == 'reencoded'
+        assert results.stats['metadata']['icc_converted'] == 1
+        output = Image.open(os.path.join(output_dir, "photo_compressed.jpg"))
+        assert 'icc_profile' not in output.info, "Converted output is untagged sRGB"
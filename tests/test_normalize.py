@@ -0,0 +1,155 @@
+"""
+Tests for normalize.py module.
+
+This test suite covers:
+- Alpha flattening over a background color
+- Palette widening and output-format normalization
+- Flattening in the compress and resize paths
+"""
+import os
+import pytest
+from PIL import Image
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from normalize import (
+    flatten_alpha,
+    normalize_image,
+    parse_background,
+    widen_palette
+)
+from compress_images import compress_images_in_directory
+from resize_aspectRatio import resize_images_fixed_resolution
+
+
+def gradient_rgba(size=(64, 32)):
+    """Create an RGBA image whose alpha runs from transparent to opaque."""
+    img = Image.new('RGBA', size)
+    width, height = size
+    img.putdata([(200, 40, 10, int(255 * x / (width - 1))) for y in range(height) for x in range(width)])
+    return img
+
+
+def reference_flatten(img, background):
+    """Composite with the textbook formula, one pixel at a time."""
+    out = Image.new('RGB', img.size)
+    out.putdata([
+        tuple((c * a + b * (255 - a) + 127) // 255 for c, b in zip((r, g, bl), background))
+        for r, g, bl, a in (img.getpixel((x, y)) for y in range(img.height) for x in range(img.width))
+    ])
+    return out
+
+
+def max_difference(a, b):
+    """Return the largest per-channel difference between two images."""
+    return max(abs(p - q) for p, q in zip(a.tobytes(), b.tobytes()))
+
+
+class TestFlattenAlpha:
+    """Test suite for alpha flattening."""
+
+    def test_parse_background(self):
+        """Test background color parsing."""
+        assert parse_background(None) == (255, 255, 255)
+        assert parse_background('black') == (0, 0, 0)
+        assert parse_background('#102030') == (16, 32, 48)
+        assert parse_background((1, 2, 3, 4)) == (1, 2, 3)
+
+    def test_opaque_and_transparent_pixels(self):
+        """Test that opaque pixels keep their color and transparent ones take the background."""
+        img = Image.new('RGBA', (2, 1))
+        img.putdata([(10, 20, 30, 255), (10, 20, 30, 0)])
+        flattened = flatten_alpha(img, (0, 128, 255))
+
+        assert flattened.mode == 'RGB'
+        assert [flattened.getpixel((x, 0)) for x in range(2)] == [(10, 20, 30), (0, 128, 255)]
+
+    @pytest.mark.parametrize("background", [(255, 255, 255), (0, 0, 0), (12, 200, 99)])
+    def test_matches_reference_compositing(self, background):
+        """Test that partial transparency blends with the background within rounding."""
+        img = gradient_rgba()
+        assert max_difference(flatten_alpha(img, background), reference_flatten(img, background)) <= 1
+
+    def test_la_image_is_flattened(self):
+        """Test that grayscale images with alpha are flattened too."""
+        img = Image.new('LA', (2, 2), (100, 0))
+        assert flatten_alpha(img, (1, 2, 3)).getpixel((0, 0)) == (1, 2, 3)
+
+    def test_palette_transparency_is_flattened(self):
+        """Test that a palette image with a transparent index is flattened."""
+        img = Image.new('P', (4, 4), 0)
+        img.putpalette([255, 0, 0, 0, 255, 0] + [0] * 762)
+        img.info['transparency'] = 0
+        flattened = flatten_alpha(img, (0, 0, 255))
+        assert flattened.getpixel((0, 0)) == (0, 0, 255)
+
+
+class TestNormalizeImage:
+    """Test suite for output-format normalization."""
+
+    def test_jpeg_output_always_flattened(self):
+        """Test that images with alpha are flattened for JPEG output."""
+        assert normalize_image(gradient_rgba(), 'JPEG').mode == 'RGB'
+
+    def test_png_output_keeps_alpha_by_default(self):
+        """Test that PNG output keeps transparency unless a background is given."""
+        img = gradient_rgba()
+        assert normalize_image(img, 'PNG') is img
+        assert normalize_image(img, 'PNG', 'white').mode == 'RGB'
+
+    def test_png_palette_untouched(self):
+        """Test that opaque palette images stay palette images for PNG output."""
+        img = Image.new('P', (4, 4))
+        assert normalize_image(img, 'PNG').mode == 'P'
+
+    def test_widen_palette(self):
+        """Test that palette images are widened before resampling."""
+        assert widen_palette(Image.new('P', (4, 4))).mode == 'RGB'
+        transparent = Image.new('P', (4, 4))
+        transparent.info['transparency'] = 0
+        assert widen_palette(transparent).mode == 'RGBA'
+
+
+class TestNormalizationInPipelines:
+    """Test suite for normalization in compress and resize."""
+
+    def test_compress_rgba_saved_as_jpg(self, temp_dir):
+        """Test that a transparent PNG with a .jpg name compresses to JPEG."""
+        img_path = os.path.join(temp_dir, "product.jpg")
+        gradient_rgba().save(img_path, format='PNG')
+
+        output_dir = os.path.join(temp_dir, "output")
+        results = compress_images_in_directory(temp_dir, output_dir, quality=80, optimize=True)
+
+        assert results[0].ok, results[0].error
+        output = Image.open(os.path.join(output_dir, "product_compressed.jpg"))
+        assert output.format == 'JPEG'
+
+    def test_compress_png_with_background(self, temp_dir):
+        """Test that a background flattens PNG output."""
+        img_path = os.path.join(temp_dir, "product.png")
+        gradient_rgba().save(img_path, format='PNG')
+
+        output_dir = os.path.join(temp_dir, "output")
+        compress_images_in_directory(temp_dir, output_dir, quality=80, optimize=True, background='black')
+
+        output = Image.open(os.path.join(output_dir, "product_compressed.png"))
+        assert output.mode == 'RGB'
+        assert output.getpixel((0, 0)) == (0, 0, 0)
+
+    def test_resize_palette_png_is_smoothly_resampled(self, temp_dir):
+        """Test that palette PNGs are resized with real resampling, not nearest-neighbour."""
+        img_path = os.path.join(temp_dir, "stripes.png")
+        img = Image.new('P', (100, 100))
+        img.putpalette([0, 0, 0, 255, 255, 255] + [0] * 762)
+        img.putdata([x % 2 for y in range(100) for x in range(100)])
+        img.save(img_path, format='PNG')
+
+        output_dir = os.path.join(temp_dir, "output")
+        resize_images_fixed_resolution(temp_dir, output_dir, width=50, height=50)
+
+        output = Image.open(os.path.join(output_dir, "stripes_resized.png")).convert('RGB')
+        red, _, _ = output.getpixel((25, 25))
+        assert 0 < red < 255, "Alternating stripes should blend to gray"
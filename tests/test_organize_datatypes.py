@@ -16,15 +16,19 @@ import sys
 # Add parent directory to path to import modules
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
+import organize_datatypes
 from organize_datatypes import (
     get_aspect_ratio,
     is_landscape_image,
     is_portrait_image,
     is_square_image,
     is_video_file,
+    get_video_bucket,
     is_image_file,
     count_files,
-    detect_and_copy_images
+    detect_and_copy_images,
+    new_organize_stats,
+    record_copy
 )
 
 
@@ -97,6 +101,19 @@ class TestFileTypeDetection:
                 f.write("")
             assert is_video_file(video_file) == True, f"{ext} file should be detected as video"
 
+    def test_get_video_bucket(self, make_video):
+        """Test that videos are bucketed by orientation."""
+        assert get_video_bucket(make_video("wide.mp4", 1920, 1080)) == 'landscape_videos'
+        assert get_video_bucket(make_video("tall.mp4", 1920, 1080, rotate=True)) == 'portrait_videos'
+        assert get_video_bucket(make_video("square.mov", 1080, 1080)) == 'square_videos'
+
+    def test_get_video_bucket_unknown(self, temp_dir):
+        """Test that unreadable videos fall back to the plain videos folder."""
+        video_file = os.path.join(temp_dir, "broken.mp4")
+        with open(video_file, 'w') as f:
+            f.write("")
+        assert get_video_bucket(video_file) == 'videos'
+
     def test_is_video_file_negative(self, sample_image_jpeg):
         """Test that non-video files are not detected as videos."""
         assert is_video_file(sample_image_jpeg) == False, "Image file should not be detected as video"
@@ -131,6 +148,141 @@ class TestCountFiles:
         assert count == 2, "Should count files in nested directories"
 
 
+class TestOrganizeStats:
+    """Test suite for run accounting collected during the organize walk."""
+
+    def test_record_copy_tallies_bucket_and_extension(self):
+        """Test that a recorded copy updates totals, bucket and extension tallies."""
+        stats = new_organize_stats()
+        record_copy(stats, 'landscape_images', 'a/photo.JPG', 100)
+        record_copy(stats, 'landscape_images', 'b/other.png', 50)
+
+        assert stats['copied'] == 2
+        assert stats['copied_bytes'] == 150
+        assert stats['buckets']['landscape_images'] == {'files': 2, 'bytes': 150}
+        assert stats['extensions']['.jpg'] == {'files': 1, 'bytes': 100}
+        assert stats['extensions']['.png'] == {'files': 1, 'bytes': 50}
+
+    def test_printed_report_separates_failures(self, temp_dir, landscape_image, capsys):
+        """Test that unreadable images are reported as failed, not skipped."""
+        with open(os.path.join(temp_dir, "bad.jpg"), 'wb') as f:
+            f.write(b"garbage bytes, not a JPEG")
+        with open(os.path.join(temp_dir, "notes.txt"), 'w') as f:
+            f.write("Not an image")
+
+        detect_and_copy_images(temp_dir, os.path.join(temp_dir, "destination"))
+
+        out = capsys.readouterr().out
+        assert "Total files failed: 1" in out
+        assert "Total files skipped: 1" in out, "Only the text file is skipped"
+
+    def test_stats_match_source_tree(self, temp_dir, landscape_image, portrait_image, square_image):
+        """Test that returned stats are exact for the source tree."""
+        text_file = os.path.join(temp_dir, "notes.txt")
+        with open(text_file, 'w') as f:
+            f.write("Not an image")
+
+        dest_dir = os.path.join(temp_dir, "destination")
+        stats = detect_and_copy_images(temp_dir, dest_dir).stats
+
+        sources = [landscape_image, portrait_image, square_image, text_file]
+        assert stats['scanned'] == 4, "Every source file should be scanned once"
+        assert stats['scanned_bytes'] == sum(os.path.getsize(p) for p in sources)
+        assert stats['copied'] == 3, "Only images should be copied"
+        assert stats['buckets']['landscape_images']['files'] == 1
+        assert stats['buckets']['portrait_images']['files'] == 1
+        assert stats['buckets']['square_images']['files'] == 1
+        assert stats['extensions']['.jpg']['bytes'] == stats['copied_bytes']
+
+    def test_destination_inside_source_not_rescanned(self, temp_dir, landscape_image):
+        """Test that a second run does not count or copy files already in the destination."""
+        dest_dir = os.path.join(temp_dir, "destination")
+        detect_and_copy_images(temp_dir, dest_dir)
+        stats = detect_and_copy_images(temp_dir, dest_dir).stats
+
+        assert stats['scanned'] == 1, "Destination contents should not be scanned"
+        assert stats['copied'] == 1
+        assert os.listdir(os.path.join(dest_dir, "landscape_images")) == ["landscape.jpg"]
+
+
+    def test_returns_per_file_results(self, temp_dir, landscape_image, portrait_image):
+        """Test that each copied file has a result with its bucket and destination."""
+        dest_dir = os.path.join(temp_dir, "destination")
+        results = detect_and_copy_images(temp_dir, dest_dir)
+
+        by_input = {result.input_path: result for result in results}
+        assert by_input[landscape_image].action == 'landscape_images'
+        assert by_input[portrait_image].output_path == os.path.join(dest_dir, "portrait_images", "portrait.jpg")
+        assert all(result.ok for result in results)
+
+    def test_copy_error_does_not_abort_batch(self, temp_dir, landscape_image, portrait_image, monkeypatch):
+        """Test that a file that cannot be copied is reported and the rest are copied."""
+        import shutil
+        real_copy = shutil.copy
+
+        def failing_copy(src, dst):
+            if src == landscape_image:
+                raise PermissionError("denied")
+            return real_copy(src, dst)
+
+        monkeypatch.setattr(shutil, 'copy', failing_copy)
+        dest_dir = os.path.join(temp_dir, "destination")
+        results = detect_and_copy_images(temp_dir, dest_dir)
+
+        assert [r.input_path for r in results.failed] == [landscape_image]
+        assert [r.input_path for r in results.succeeded] == [portrait_image]
+        assert results.stats['copied'] == 1
+
+    def test_corrupt_image_recorded_as_error(self, temp_dir, landscape_image):
+        """Test that an unreadable image is reported as an error, not copied into a bucket."""
+        bad_image = os.path.join(temp_dir, "bad.jpg")
+        with open(bad_image, 'wb') as f:
+            f.write(b"garbage bytes, not a JPEG")
+
+        dest_dir = os.path.join(temp_dir, "destination")
+        results = detect_and_copy_images(temp_dir, dest_dir)
+
+        assert [r.input_path for r in results.failed] == [bad_image]
+        assert results.failed[0].status == 'error'
+        assert results.failed[0].error
+        assert [r.input_path for r in results.succeeded] == [landscape_image]
+        assert results.stats['copied'] == 1
+        assert results.stats['failed'] == 1
+        assert results.stats['failed_bytes'] == os.path.getsize(bad_image)
+        for bucket in os.listdir(dest_dir):
+            assert "bad.jpg" not in os.listdir(os.path.join(dest_dir, bucket))
+
+
+    def test_missing_source_folder_is_recorded(self, temp_dir, capsys):
+        """Test that a missing source folder fails the run instead of reporting success."""
+        results = detect_and_copy_images(os.path.join(temp_dir, "nope"), os.path.join(temp_dir, "destination"))
+
+        assert not results.ok
+        assert results.error.startswith("FileNotFoundError")
+        assert "organized successfully" not in capsys.readouterr().out
+
+    def test_folder_headers_read_in_one_batch(self, temp_dir, landscape_image, portrait_image, monkeypatch):
+        """Test that each folder's image headers go through the batched reader."""
+        calls = []
+        real_batch = organize_datatypes.get_image_dimensions_batch
+
+        def counting_batch(paths, max_workers=None):
+            calls.append(sorted(paths))
+            return real_batch(paths, max_workers)
+
+        monkeypatch.setattr(organize_datatypes, 'get_image_dimensions_batch', counting_batch)
+        bad_image = os.path.join(temp_dir, "bad.jpg")
+        with open(bad_image, 'wb') as f:
+            f.write(b"garbage bytes, not a JPEG")
+
+        dest_dir = os.path.join(temp_dir, "destination")
+        results = detect_and_copy_images(temp_dir, dest_dir)
+
+        assert calls == [sorted([landscape_image, portrait_image, bad_image])]
+        assert [r.input_path for r in results.failed] == [bad_image]
+        assert {r.action for r in results.succeeded} == {'landscape_images', 'portrait_images'}
+
+
 class TestOrganizeImages:
     """Test suite for image organization functionality."""
 
@@ -192,6 +344,22 @@ class TestOrganizeImages:
         assert os.path.exists(os.path.join(dest_dir, "portrait_images"))
         assert os.path.exists(os.path.join(dest_dir, "square_images"))
         assert os.path.exists(os.path.join(dest_dir, "videos"))
+        assert os.path.exists(os.path.join(dest_dir, "landscape_videos"))
+        assert os.path.exists(os.path.join(dest_dir, "portrait_videos"))
+        assert os.path.exists(os.path.join(dest_dir, "square_videos"))
+
+    def test_organize_videos_by_orientation(self, temp_dir, make_video):
+        """Test that videos are copied into orientation folders."""
+        make_video("wide.mp4", 1920, 1080)
+        make_video("phone.mov", 1920, 1080, rotate=True)
+
+        dest_dir = os.path.join(temp_dir, "destination")
+        stats = detect_and_copy_images(temp_dir, dest_dir).stats
+
+        assert os.path.exists(os.path.join(dest_dir, "landscape_videos", "wide.mp4"))
+        assert os.path.exists(os.path.join(dest_dir, "portrait_videos", "phone.mov"))
+        assert stats['buckets']['landscape_videos']['files'] == 1
+        assert stats['buckets']['portrait_videos']['files'] == 1
 
     def test_preserves_relative_path_structure(self, temp_dir, landscape_image):
         """Test that relative path structure is preserved."""
@@ -0,0 +1,175 @@
+"""
+Tests for profiling.py module.
+
+This test suite covers:
+- CLI argument registration
+- Disabled profiler passthrough
+- Whole-run CPU profiles readable by pstats
+- Memory summaries from tracemalloc
+- Sampling every Nth file
+- Exclusive memory tracing of sampled files with parallel workers
+- Profiles merged across worker threads
+"""
+import argparse
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import pytest
+from PIL import Image
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from profiling import RunProfiler, add_profiling_arguments, profiler_from_args
+from compress_images import compress_images_in_directory
+from organize_datatypes import detect_and_copy_images
+from scheduler import run_jobs
+
+
+def make_images(folder, count):
+    """Create a folder of small JPEGs and return it."""
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        Image.new('RGB', (200 + i * 10, 100), color='blue').save(os.path.join(folder, f"img{i}.jpg"), quality=90)
+    return folder
+
+
+def profiled_functions(path):
+    """Return the function names recorded in a pstats dump."""
+    return {name for _, _, name in pstats.Stats(path).stats}
+
+
+class TestProfilerSetup:
+    """Test suite for CLI arguments and the disabled profiler."""
+
+    def test_arguments_default_to_disabled(self):
+        """Test that profiling is off unless a file is given."""
+        parser = argparse.ArgumentParser()
+        add_profiling_arguments(parser)
+        profiler = profiler_from_args(parser.parse_args([]))
+        assert not profiler.enabled
+        assert profiler.every == 1
+        assert profiler.top == 25
+
+    def test_arguments_are_parsed(self):
+        """Test that profiling options reach the profiler."""
+        parser = argparse.ArgumentParser()
+        add_profiling_arguments(parser)
+        args = parser.parse_args(['--profile-cpu', 'a.prof', '--profile-mem', 'm.txt',
+                                  '--profile-every', '10', '--profile-top', '5'])
+        profiler = profiler_from_args(args)
+        assert profiler.enabled
+        assert (profiler.cpu_file, profiler.mem_file, profiler.every, profiler.top) == ('a.prof', 'm.txt', 10, 5)
+
+    def test_disabled_profiler_returns_job_unchanged(self):
+        """Test that wrapping is free when profiling is off."""
+        profiler = RunProfiler()
+        job = lambda path: path
+        assert profiler.wrap(job) is job
+        with profiler.run():
+            pass
+
+
+class TestRunProfiles:
+    """Test suite for CPU and memory profiles of real runs."""
+
+    def test_cpu_profile_covers_run(self, temp_dir):
+        """Test that the whole-run CPU dump is loadable and covers the job."""
+        input_dir = make_images(os.path.join(temp_dir, "in"), 3)
+        cpu_file = os.path.join(temp_dir, "run.prof")
+        profiler = RunProfiler(cpu_file=cpu_file)
+        with profiler.run():
+            compress_images_in_directory(input_dir, os.path.join(temp_dir, "out"), 50, True, profiler=profiler)
+
+        functions = profiled_functions(cpu_file)
+        assert 'compress_image' in functions
+        assert 'compress_images_in_directory' in functions
+
+    def test_cpu_profile_merges_worker_threads(self, temp_dir):
+        """Test that work done on worker threads ends up in the dump."""
+        input_dir = make_images(os.path.join(temp_dir, "in"), 6)
+        cpu_file = os.path.join(temp_dir, "run.prof")
+        profiler = RunProfiler(cpu_file=cpu_file)
+        with profiler.run():
+            compress_images_in_directory(input_dir, os.path.join(temp_dir, "out"), 50, True, workers=3,
+                                         profiler=profiler)
+
+        stats = pstats.Stats(cpu_file).stats
+        calls = sum(value[1] for (_, _, name), value in stats.items() if name == 'compress_image')
+        assert calls == 6
+
+    def test_memory_report_written(self, temp_dir):
+        """Test that the tracemalloc summary lists peak memory and sites."""
+        input_dir = make_images(os.path.join(temp_dir, "in"), 2)
+        mem_file = os.path.join(temp_dir, "mem.txt")
+        profiler = RunProfiler(mem_file=mem_file, top=5)
+        with profiler.run():
+            detect_and_copy_images(input_dir, os.path.join(temp_dir, "sorted"), profiler=profiler)
+
+        with open(mem_file) as f:
+            report = f.read()
+        assert "whole run" in report
+        assert "Peak traced memory:" in report
+        assert "allocation sites still held at the end of the run" in report
+        assert profiler.peak_memory > 0
+
+    def test_sampling_profiles_every_nth_file(self, temp_dir):
+        """Test that --profile-every limits profiling to a sample of files."""
+        input_dir = make_images(os.path.join(temp_dir, "in"), 5)
+        cpu_file = os.path.join(temp_dir, "run.prof")
+        mem_file = os.path.join(temp_dir, "mem.txt")
+        profiler = RunProfiler(cpu_file=cpu_file, mem_file=mem_file, every=2)
+        with profiler.run():
+            results = compress_images_in_directory(input_dir, os.path.join(temp_dir, "out"), 50, True,
+                                                   profiler=profiler)
+
+        assert len(results.succeeded) == 5
+        assert profiler.calls == 5
+        assert profiler.sampled == 3
+        assert len(profiler.file_peaks) == 3
+        stats = pstats.Stats(cpu_file).stats
+        calls = sum(value[1] for (_, _, name), value in stats.items() if name == 'compress_image')
+        assert calls == 3
+        # Only the sampled jobs are profiled, not the directory walk.
+        assert 'compress_images_in_directory' not in profiled_functions(cpu_file)
+        with open(mem_file) as f:
+            assert "3 of 5 files sampled (every 2)" in f.read()
+
+    def test_no_sampled_files_skips_cpu_dump(self, temp_dir, capsys):
+        """Test that an empty sampled run does not write a broken profile."""
+        cpu_file = os.path.join(temp_dir, "run.prof")
+        profiler = RunProfiler(cpu_file=cpu_file, every=3)
+        with profiler.run():
+            pass
+        assert not os.path.exists(cpu_file)
+        assert "no files were profiled" in capsys.readouterr().out
+
+    def test_sampled_memory_trace_runs_alone(self, temp_dir):
+        """Test that no other job runs while a sampled file is traced."""
+        profiler = RunProfiler(mem_file=os.path.join(temp_dir, "mem.txt"), every=3, top=50)
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+
+        def job(path):
+            with lock:
+                running.append(path)
+                if tracemalloc.is_tracing():
+                    overlaps.append(len(running))
+            time.sleep(0.02)
+            with lock:
+                running.remove(path)
+            return path
+
+        paths = [os.path.join(temp_dir, f"file{i}.jpg") for i in range(12)]
+        with profiler.run():
+            run_jobs(profiler.wrap(job), paths, workers=4)
+
+        assert profiler.sampled == 4
+        assert overlaps == [1, 1, 1, 1], "Sampled files must be traced with nothing else running"
+        with open(profiler.mem_file) as f:
+            report = f.read()
+        assert "Top 4 sampled files by peak memory:" in report
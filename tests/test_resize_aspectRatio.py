@@ -196,3 +196,34 @@ class TestResizeAspectRatio:
         
         assert os.path.exists(output_dir), "Output directory should be created"
 
+
+    def test_parallel_workers(self, temp_dir, sample_image_jpeg, sample_image_png):
+        """Test that resizing with several workers produces every output."""
+        output_dir = os.path.join(temp_dir, "output")
+        resize_images_fixed_resolution(
+            temp_dir, output_dir, width=400, height=300, quality=85, optimize=True, workers=2
+        )
+
+        assert sorted(os.listdir(output_dir)) == ["test_image_resized.jpg", "test_image_resized.png"]
+
+    def test_bad_file_does_not_abort_batch(self, temp_dir, sample_image_jpeg, sample_image_png):
+        """Test that a corrupted image is reported and the rest are still resized."""
+        fake_image = os.path.join(temp_dir, "fake.jpg")
+        with open(fake_image, 'w') as f:
+            f.write("This is not a real image")
+
+        output_dir = os.path.join(temp_dir, "output")
+        results = resize_images_fixed_resolution(
+            temp_dir, output_dir, width=400, height=300, quality=85, optimize=True
+        )
+
+        assert len(results.succeeded) == 2, "Valid images should still be resized"
+        assert [r.input_path for r in results.failed] == [fake_image]
+        assert all(r.action == 'resized' for r in results.succeeded)
+
+    def test_missing_input_directory_is_recorded(self, temp_dir):
+        """Test that a missing input folder is reported on the results, not just printed."""
+        results = resize_images_fixed_resolution(os.path.join(temp_dir, "nope"), os.path.join(temp_dir, "output"),
+                                                 width=100, height=100)
+        assert not results.ok
+        assert results.error.startswith("FileNotFoundError")
@@ -0,0 +1,113 @@
+"""
+Tests for results.py module.
+
+This test suite covers:
+- FileResult records and their compact layout
+- ResultSet collection helpers and summaries
+- Per-file error isolation in run_file
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from results import FileResult, ResultSet, run_file
+
+
+def write_file(folder, name, size):
+    """Write a file of the given size and return its path."""
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    return path
+
+
+class TestFileResult:
+    """Test suite for per-file result records."""
+
+    def test_defaults(self):
+        """Test that a new record is successful and empty."""
+        result = FileResult("in.jpg")
+        assert result.ok
+        assert result.output_path is None
+        assert result.error is None
+
+    def test_slots_have_no_instance_dict(self):
+        """Test that records use __slots__ instead of a per-instance dict."""
+        result = FileResult("in.jpg")
+        assert not hasattr(result, '__dict__')
+        with pytest.raises(AttributeError):
+            result.unknown_field = 1
+
+
+class TestResultSet:
+    """Test suite for result collections."""
+
+    def test_succeeded_failed_and_summary(self):
+        """Test splitting and summarizing a mixed result set."""
+        results = ResultSet()
+        results.append(FileResult("a.jpg", "out/a.jpg", input_bytes=100, output_bytes=40, elapsed=0.5))
+        results.append(FileResult("b.jpg", status='error', input_bytes=50, error="OSError: boom", elapsed=0.25))
+
+        assert len(results) == 2
+        assert [r.input_path for r in results.succeeded] == ["a.jpg"]
+        assert [r.input_path for r in results.failed] == ["b.jpg"]
+        assert results.ok
+        assert results.summary() == {
+            'status': 'ok',
+            'error': None,
+            'files': 2,
+            'succeeded': 1,
+            'failed': 1,
+            'input_bytes': 150,
+            'output_bytes': 40,
+            'elapsed': 0.75,
+        }
+
+    def test_run_level_error(self):
+        """Test that a failed run is distinguishable from an empty one."""
+        results = ResultSet(error="FileNotFoundError: missing")
+        assert not results.ok
+        assert results.summary()['status'] == 'error'
+        assert results.summary()['error'] == "FileNotFoundError: missing"
+        assert ResultSet().summary()['status'] == 'ok'
+
+
+class TestRunFile:
+    """Test suite for running a single file job."""
+
+    def test_successful_job(self, temp_dir):
+        """Test that a successful job records paths, bytes and action."""
+        input_path = write_file(temp_dir, "in.bin", 10)
+        output_path = os.path.join(temp_dir, "out.bin")
+
+        def job(path):
+            write_file(temp_dir, "out.bin", 4)
+            return output_path, 'converted', 'note'
+
+        result = run_file(job, input_path)
+        assert result.ok
+        assert result.output_path == output_path
+        assert (result.action, result.detail) == ('converted', 'note')
+        assert (result.input_bytes, result.output_bytes) == (10, 4)
+        assert result.elapsed >= 0
+
+    def test_failing_job_is_isolated(self, temp_dir):
+        """Test that an exception is recorded instead of raised."""
+        input_path = write_file(temp_dir, "in.bin", 10)
+
+        def job(path):
+            raise ValueError("bad data")
+
+        result = run_file(job, input_path)
+        assert result.status == 'error'
+        assert result.error == "ValueError: bad data"
+        assert result.input_bytes == 10
+
+    def test_known_input_size_is_used(self, temp_dir):
+        """Test that a caller-provided input size skips the stat."""
+        input_path = write_file(temp_dir, "in.bin", 10)
+        result = run_file(lambda path: (input_path, 'noop', None), input_path, input_bytes=99)
+        assert result.input_bytes == 99
@@ -0,0 +1,148 @@
+"""
+Tests for scheduler.py module.
+
+This test suite covers:
+- Cost estimation from file size and header dimensions
+- Longest-processing-time-first ordering
+- Serial and parallel job execution
+- Per-worker utilization statistics
+- Error propagation from jobs
+"""
+import os
+import threading
+import time
+import pytest
+from PIL import Image
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import scheduler
+from scheduler import file_cost, order_by_cost, run_jobs
+
+
+def make_image(folder, name, size):
+    """Create a JPEG of the given size and return its path."""
+    path = os.path.join(folder, name)
+    Image.new('RGB', size, color='red').save(path, format='JPEG')
+    return path
+
+
+class TestCostEstimation:
+    """Test suite for job cost estimation and ordering."""
+
+    def test_larger_image_costs_more(self, temp_dir):
+        """Test that more pixels means a higher estimated cost."""
+        small = make_image(temp_dir, "small.jpg", (100, 100))
+        large = make_image(temp_dir, "large.jpg", (1000, 1000))
+        assert file_cost(large, (1000, 1000)) > file_cost(small, (100, 100))
+        assert order_by_cost([small, large]) == [large, small]
+
+    def test_unreadable_header_uses_file_size(self, temp_dir):
+        """Test that files without a readable header fall back to their size."""
+        fake_image = os.path.join(temp_dir, "fake.png")
+        with open(fake_image, 'w') as f:
+            f.write("x" * 123)
+        assert file_cost(fake_image, None) == 123
+
+    def test_missing_file_costs_nothing(self, temp_dir):
+        """Test that a vanished file does not break estimation."""
+        missing = os.path.join(temp_dir, "missing.jpg")
+        assert file_cost(missing, None) == 0
+        assert order_by_cost([missing]) == [missing]
+
+    def test_order_by_cost_largest_first(self, temp_dir):
+        """Test LPT ordering puts the most expensive files first."""
+        small = make_image(temp_dir, "small.jpg", (100, 100))
+        large = make_image(temp_dir, "large.jpg", (1000, 1000))
+        medium = make_image(temp_dir, "medium.jpg", (400, 400))
+        assert order_by_cost([small, large, medium]) == [large, medium, small]
+
+    def test_order_by_cost_reads_headers_in_one_batch(self, temp_dir, monkeypatch):
+        """Test that the pre-pass reads all headers through the batched reader."""
+        calls = []
+        real_batch = scheduler.get_image_dimensions_batch
+
+        def counting_batch(paths, max_workers=None):
+            calls.append((list(paths), max_workers))
+            return real_batch(paths, max_workers)
+
+        monkeypatch.setattr(scheduler, 'get_image_dimensions_batch', counting_batch)
+        small = make_image(temp_dir, "small.jpg", (100, 100))
+        large = make_image(temp_dir, "large.jpg", (1000, 1000))
+        fake_image = os.path.join(temp_dir, "fake.png")
+        with open(fake_image, 'w') as f:
+            f.write("x" * 123)
+
+        run_jobs(lambda path: path, [small, fake_image, large], workers=3)
+        assert calls == [([small, fake_image, large], 3)]
+        assert order_by_cost([small, fake_image, large]) == [large, small, fake_image]
+
+
+class TestRunJobs:
+    """Test suite for job execution and statistics."""
+
+    def test_serial_run_keeps_input_order(self, temp_dir):
+        """Test that a single worker processes files in the given order."""
+        paths = [make_image(temp_dir, f"img{i}.jpg", (10 * (i + 1), 10)) for i in range(3)]
+        seen = []
+        results, stats = run_jobs(lambda path: seen.append(path) or path.upper(), paths, workers=1)
+
+        assert seen == paths
+        assert results == [path.upper() for path in paths]
+        assert stats['jobs'] == {0: 3}
+
+    def test_parallel_run_dispatches_largest_first(self, temp_dir):
+        """Test that parallel runs start with the most expensive file."""
+        small = make_image(temp_dir, "small.jpg", (100, 100))
+        large = make_image(temp_dir, "large.jpg", (1000, 1000))
+        started = []
+        lock = threading.Lock()
+
+        def job(path):
+            with lock:
+                started.append(path)
+            return os.path.basename(path)
+
+        results, stats = run_jobs(job, [small, large], workers=2)
+
+        assert started[0] == large, "Most expensive file should be dispatched first"
+        assert results == ["small.jpg", "large.jpg"], "Results should follow input order"
+        assert sum(stats['jobs'].values()) == 2
+
+    def test_utilization_stats(self, temp_dir):
+        """Test that utilization is reported as a fraction of worker capacity."""
+        paths = [make_image(temp_dir, f"img{i}.jpg", (50, 50)) for i in range(4)]
+        _, stats = run_jobs(lambda path: path, paths, workers=2)
+
+        assert stats['workers'] == 2
+        assert stats['wall_time'] >= 0
+        assert 0 <= stats['utilization'] <= 1
+        assert set(stats['busy_time']) == set(stats['jobs'])
+
+    def test_ordering_pre_pass_excluded_from_utilization(self, temp_dir, monkeypatch):
+        """Test that time spent ordering is reported separately and does not count as idle."""
+        real_order = scheduler.order_by_cost
+
+        def slow_order(paths, workers=None):
+            time.sleep(0.3)
+            return real_order(paths, workers)
+
+        monkeypatch.setattr(scheduler, 'order_by_cost', slow_order)
+        paths = [make_image(temp_dir, f"img{i}.jpg", (50, 50)) for i in range(4)]
+        _, stats = run_jobs(lambda path: time.sleep(0.05), paths, workers=2)
+
+        assert stats['ordering_time'] >= 0.3
+        assert stats['wall_time'] < 0.3, "Wall time should cover dispatch only"
+        assert stats['utilization'] > 0.5
+
+    def test_job_errors_propagate(self, temp_dir):
+        """Test that an exception raised by a job reaches the caller."""
+        path = make_image(temp_dir, "img.jpg", (50, 50))
+
+        def failing_job(path):
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            run_jobs(failing_job, [path], workers=2)
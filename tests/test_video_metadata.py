@@ -0,0 +1,85 @@
+"""
+Tests for video_metadata.py module.
+
+This test suite covers:
+- Track dimension extraction from 'tkhd' atoms
+- Rotation matrix handling
+- Skipping audio tracks and media data
+- Error handling for truncated or non-MP4 files
+"""
+import os
+import pytest
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from video_metadata import get_video_dimensions, get_video_aspect_ratio
+
+
+class TestVideoDimensions:
+    """Test suite for MP4/QuickTime dimension probing."""
+
+    def test_landscape_video_dimensions(self, make_video):
+        """Test reading width and height of a landscape video track."""
+        video = make_video("clip.mp4", 1920, 1080)
+        assert get_video_dimensions(video) == (1920, 1080)
+
+    def test_rotated_video_swaps_dimensions(self, make_video):
+        """Test that a 90 degree rotation matrix swaps width and height."""
+        video = make_video("phone.mov", 1920, 1080, rotate=True)
+        assert get_video_dimensions(video) == (1080, 1920)
+
+    def test_version_1_tkhd(self, make_video):
+        """Test parsing a version 1 'tkhd' with 64-bit times."""
+        video = make_video("v1.mp4", 640, 640, version=1)
+        assert get_video_dimensions(video) == (640, 640)
+
+    def test_large_media_data_is_not_read(self, make_video, monkeypatch):
+        """Test that the probe seeks past 'mdat' instead of reading it."""
+        video = make_video("big.mp4", 1280, 720, mdat_size=1024 * 1024)
+
+        import builtins
+        real_open = builtins.open
+        bytes_read = []
+
+        class CountingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def read(self, n=-1):
+                data = self._f.read(n)
+                bytes_read.append(len(data))
+                return data
+
+            def __getattr__(self, name):
+                return getattr(self._f, name)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                self._f.close()
+
+        monkeypatch.setattr(builtins, 'open', lambda *a, **k: CountingFile(real_open(*a, **k)))
+        assert get_video_dimensions(video) == (1280, 720)
+        assert sum(bytes_read) < 1024, "Only box headers and 'tkhd' should be read"
+
+    def test_non_mp4_file_returns_none(self, temp_dir):
+        """Test that a file without a 'moov' box yields no dimensions."""
+        video = os.path.join(temp_dir, "fake.mp4")
+        with open(video, 'w') as f:
+            f.write("This is not a video")
+        assert get_video_dimensions(video) is None
+        assert get_video_aspect_ratio(video) == 0
+
+    def test_empty_file_returns_none(self, temp_dir):
+        """Test that an empty file yields no dimensions."""
+        video = os.path.join(temp_dir, "empty.mov")
+        open(video, 'w').close()
+        assert get_video_dimensions(video) is None
+
+    def test_aspect_ratio(self, make_video):
+        """Test aspect ratio calculation for a portrait video."""
+        video = make_video("tall.mp4", 720, 1280)
+        assert get_video_aspect_ratio(video) == 720 / 1280
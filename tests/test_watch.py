@@ -0,0 +1,287 @@
+"""
+Tests for watch.py module.
+
+This test suite covers:
+- inotify and polling watcher backends
+- Debouncing of partially written files
+- Waiting for close-write on inotify, even through long stalls
+- Incremental processing of only new or changed files
+- Recursive watching with an excluded destination
+- Watch mode for compression
+"""
+import os
+import threading
+import time
+import pytest
+from PIL import Image
+import sys
+
+# Add parent directory to path to import modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from watch import CHANGED, CLOSED, PollingWatcher, create_watcher, scan_files, watch_folder, watch_image_folder
+from compress_images import watch_and_compress
+
+BACKENDS = ['polling']
+if sys.platform.startswith('linux'):
+    BACKENDS.append('inotify')
+
+
+def wait_for(condition, timeout=5.0):
+    """Poll a condition until it holds or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+
+class WatchRunner:
+    """Run watch_folder in a background thread and record processed paths and sizes."""
+
+    def __init__(self, folder, **kwargs):
+        self.processed = []
+        self.sizes = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        kwargs.setdefault('settle', 0.1)
+        kwargs.setdefault('interval', 0.05)
+        self.thread = threading.Thread(
+            target=watch_folder,
+            args=(folder, self.process),
+            kwargs=dict(kwargs, stop_event=self.stop_event),
+        )
+
+    def process(self, path):
+        with self.lock:
+            self.processed.append(path)
+            self.sizes.append(os.path.getsize(path))
+
+    def __enter__(self):
+        self.thread.start()
+        time.sleep(0.1)
+        return self
+
+    def __exit__(self, *args):
+        self.stop_event.set()
+        self.thread.join(timeout=5)
+
+
+def write_file(path, content=b"data"):
+    """Write bytes to a file."""
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+class TestWatchers:
+    """Test suite for the watcher backends."""
+
+    def test_create_watcher_falls_back_to_polling(self, temp_dir):
+        """Test that the polling backend can be requested explicitly."""
+        watcher = create_watcher(temp_dir, backend='polling')
+        assert isinstance(watcher, PollingWatcher)
+        watcher.close()
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_reports_existing_and_new_files(self, temp_dir, backend):
+        """Test that both backends list existing files and report new ones."""
+        existing = os.path.join(temp_dir, "existing.jpg")
+        write_file(existing)
+        watcher = create_watcher(temp_dir, backend=backend)
+        try:
+            assert watcher.existing_files() == [existing]
+
+            new_file = os.path.join(temp_dir, "new.jpg")
+            write_file(new_file)
+            changed = []
+            assert wait_for(lambda: changed.extend(path for path, _ in watcher.poll(0.05)) or new_file in changed)
+        finally:
+            watcher.close()
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_recursive_watch_skips_excluded_folder(self, temp_dir, backend):
+        """Test that new subfolders are watched and the excluded folder is not."""
+        excluded = os.path.join(temp_dir, "out")
+        os.makedirs(excluded)
+        watcher = create_watcher(temp_dir, recursive=True, exclude=excluded, backend=backend)
+        try:
+            subdir = os.path.join(temp_dir, "sub")
+            os.makedirs(subdir)
+            changed = []
+            # Give the watcher a chance to pick up the new directory first.
+            wait_for(lambda: changed.extend(path for path, _ in watcher.poll(0.05)) or False, timeout=0.3)
+
+            nested = os.path.join(subdir, "nested.jpg")
+            write_file(nested)
+            write_file(os.path.join(excluded, "ignored.jpg"))
+            assert wait_for(lambda: changed.extend(path for path, _ in watcher.poll(0.05)) or nested in changed)
+            watcher.poll(0.1)
+            assert not any(path.startswith(excluded) for path in changed)
+        finally:
+            watcher.close()
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_recursive_watch_does_not_follow_directory_symlinks(self, temp_dir, backend):
+        """Test that a symlink back up the tree does not repeat files, like os.walk."""
+        image = os.path.join(temp_dir, "a.jpg")
+        write_file(image)
+        subdir = os.path.join(temp_dir, "sub")
+        os.makedirs(subdir)
+        os.symlink("..", os.path.join(subdir, "up"))
+
+        watcher = create_watcher(temp_dir, recursive=True, backend=backend)
+        try:
+            assert watcher.existing_files() == [image]
+        finally:
+            watcher.close()
+        assert [path for path, _ in scan_files(temp_dir, recursive=True)] == [image]
+
+    def test_polling_reports_changes_for_settling(self, temp_dir):
+        """Test that the polling backend leaves completion to the settle timer."""
+        watcher = create_watcher(temp_dir, backend='polling')
+        path = os.path.join(temp_dir, "new.jpg")
+        write_file(path)
+        assert watcher.poll(0.01) == [(path, CHANGED)]
+
+    @pytest.mark.skipif('inotify' not in BACKENDS, reason="inotify is Linux-only")
+    def test_inotify_reports_close_write(self, temp_dir):
+        """Test that inotify marks a file closed once its writer closes it."""
+        watcher = create_watcher(temp_dir, backend='inotify')
+        try:
+            path = os.path.join(temp_dir, "new.jpg")
+            write_file(path)
+            events = []
+            assert wait_for(lambda: events.extend(watcher.poll(0.05)) or (path, CLOSED) in events)
+        finally:
+            watcher.close()
+
+
+class TestWatchFolder:
+    """Test suite for incremental processing."""
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_processes_existing_and_new_files_once(self, temp_dir, backend):
+        """Test that existing and new files are each processed exactly once."""
+        existing = os.path.join(temp_dir, "existing.jpg")
+        write_file(existing)
+
+        with WatchRunner(temp_dir, backend=backend) as runner:
+            new_file = os.path.join(temp_dir, "new.jpg")
+            write_file(new_file)
+            assert wait_for(lambda: len(runner.processed) == 2)
+            time.sleep(0.3)
+
+        assert sorted(runner.processed) == sorted([existing, new_file])
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_changed_file_is_reprocessed(self, temp_dir, backend):
+        """Test that rewriting a file processes it again."""
+        path = os.path.join(temp_dir, "image.jpg")
+        write_file(path, b"first")
+
+        with WatchRunner(temp_dir, backend=backend) as runner:
+            assert wait_for(lambda: len(runner.processed) == 1)
+            write_file(path, b"second version")
+            assert wait_for(lambda: len(runner.processed) == 2)
+
+    @pytest.mark.parametrize("backend", BACKENDS)
+    def test_partial_writes_are_debounced(self, temp_dir, backend):
+        """Test that a file still being written is processed only once it settles."""
+        path = os.path.join(temp_dir, "upload.jpg")
+
+        with WatchRunner(temp_dir, backend=backend, settle=0.3) as runner:
+            with open(path, 'wb') as f:
+                for _ in range(5):
+                    f.write(b"chunk" * 100)
+                    f.flush()
+                    time.sleep(0.1)
+                    assert runner.processed == [], "Partial file should not be processed"
+            assert wait_for(lambda: runner.processed == [path])
+            time.sleep(0.4)
+
+        assert runner.processed == [path]
+
+    @pytest.mark.skipif('inotify' not in BACKENDS, reason="inotify is Linux-only")
+    def test_stalled_upload_waits_for_close(self, temp_dir):
+        """Test that an upload pausing longer than settle is processed once, after close."""
+        path = os.path.join(temp_dir, "upload.jpg")
+
+        with WatchRunner(temp_dir, backend='inotify', settle=0.1) as runner:
+            with open(path, 'wb') as f:
+                for _ in range(3):
+                    f.write(b"x" * 1000)
+                    f.flush()
+                    time.sleep(0.4)
+                    assert runner.sizes == [], "Open file should not be processed"
+            assert wait_for(lambda: runner.sizes == [3000])
+            time.sleep(0.3)
+
+        assert runner.processed == [path]
+        assert runner.sizes == [3000]
+
+    def test_accept_filters_files(self, temp_dir):
+        """Test that rejected files are never processed."""
+        with WatchRunner(temp_dir, accept=lambda path: path.endswith('.jpg')) as runner:
+            write_file(os.path.join(temp_dir, "notes.txt"))
+            image = os.path.join(temp_dir, "image.jpg")
+            write_file(image)
+            assert wait_for(lambda: runner.processed == [image])
+            time.sleep(0.2)
+
+        assert runner.processed == [image]
+
+
+class TestWatchAndCompress:
+    """Test suite for compress watch mode."""
+
+    def test_new_image_is_compressed(self, temp_dir):
+        """Test that an image dropped into the folder is compressed."""
+        output_dir = os.path.join(temp_dir, "output")
+        stop_event = threading.Event()
+        thread = threading.Thread(
+            target=watch_and_compress,
+            args=(temp_dir, output_dir, 50, True),
+            kwargs={'stop_event': stop_event},
+        )
+        thread.start()
+        try:
+            Image.new('RGB', (200, 100), color='red').save(os.path.join(temp_dir, "upload.jpg"), format='JPEG')
+            output_file = os.path.join(output_dir, "upload_compressed.jpg")
+            assert wait_for(lambda: os.path.exists(output_file), timeout=10)
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+
+    def test_image_folder_runs_job_for_new_images(self, temp_dir, capsys):
+        """Test that the shared image watcher runs the job on new images only."""
+        output_dir = os.path.join(temp_dir, "output")
+        inputs = []
+
+        def job(path):
+            inputs.append(path)
+            output_path = os.path.join(output_dir, os.path.basename(path))
+            write_file(output_path)
+            return output_path, 'written', None
+
+        stop_event = threading.Event()
+        thread = threading.Thread(target=watch_image_folder, args=(temp_dir, output_dir, job),
+                                  kwargs={'stop_event': stop_event})
+        thread.start()
+        try:
+            write_file(os.path.join(temp_dir, "notes.txt"))
+            upload = os.path.join(temp_dir, "upload.jpg")
+            write_file(upload)
+            assert wait_for(lambda: inputs == [upload])
+            time.sleep(0.3)
+        finally:
+            stop_event.set()
+            thread.join(timeout=5)
+
+        assert inputs == [upload]
+        assert "upload.jpg: written" in capsys.readouterr().out
+
+    def test_image_folder_rejects_output_in_input(self, temp_dir):
+        """Test that writing outputs into the watched folder itself is refused."""
+        with pytest.raises(ValueError):
+            watch_image_folder(temp_dir, temp_dir, lambda path: (path, 'written', None))
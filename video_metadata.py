@@ -0,0 +1,88 @@
+import os
+import struct
+
+# Containers that may hold a 'tkhd' atom on the way down from the top level.
+CONTAINER_BOXES = (b'moov', b'trak')
+
+def read_box_header(f, end):
+    start = f.tell()
+    if end - start < 8:
+        return None
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+    size, box_type = struct.unpack('>I4s', header)
+    header_size = 8
+    if size == 1:
+        large = f.read(8)
+        if len(large) < 8:
+            return None
+        size = struct.unpack('>Q', large)[0]
+        header_size = 16
+    elif size == 0:
+        size = end - start
+    if size < header_size or start + size > end:
+        return None
+    return box_type, start + header_size, start + size
+
+def iter_boxes(f, start, end):
+    position = start
+    while position < end:
+        f.seek(position)
+        header = read_box_header(f, end)
+        if header is None:
+            return
+        yield header
+        # Skip the payload by seeking; 'mdat' and friends are never read.
+        position = header[2]
+
+def parse_tkhd(payload):
+    if len(payload) < 4:
+        return None
+    version = payload[0]
+    # Skip version/flags, times, track id, reserved and duration.
+    offset = 4 + (32 if version == 1 else 20)
+    # Skip reserved, layer, alternate group, volume and reserved.
+    offset += 16
+    if len(payload) < offset + 36 + 8:
+        return None
+    matrix = struct.unpack_from('>9i', payload, offset)
+    width, height = struct.unpack_from('>II', payload, offset + 36)
+    width = width >> 16
+    height = height >> 16
+    if width == 0 or height == 0:
+        return None
+    # A 90 or 270 degree rotation leaves a == d == 0 in the 16.16 matrix.
+    a, b = matrix[0], matrix[1]
+    if a == 0 and b != 0:
+        width, height = height, width
+    return width, height
+
+def find_track_dimensions(f, start, end):
+    for box_type, payload_start, box_end in iter_boxes(f, start, end):
+        if box_type in CONTAINER_BOXES:
+            dimensions = find_track_dimensions(f, payload_start, box_end)
+            if dimensions is not None:
+                return dimensions
+        elif box_type == b'tkhd':
+            f.seek(payload_start)
+            # Audio tracks report 0x0; keep looking for a visual track.
+            dimensions = parse_tkhd(f.read(min(box_end - payload_start, 120)))
+            if dimensions is not None:
+                return dimensions
+    return None
+
+def get_video_dimensions(video_path):
+    try:
+        with open(video_path, 'rb') as f:
+            return find_track_dimensions(f, 0, os.fstat(f.fileno()).st_size)
+    except Exception as e:
+        print(f"Error while reading video metadata: {e}")
+        return None
+
+def get_video_aspect_ratio(video_path):
+    dimensions = get_video_dimensions(video_path)
+    if dimensions is None:
+        return 0
+    width, height = dimensions
+    return width / height
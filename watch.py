@@ -0,0 +1,258 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from results import run_file
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+EVENT_HEADER = struct.Struct('iIII')
+
+# What a watcher knows about a reported file. CHANGED files are processed
+# once their size and mtime settle, WRITING files wait for the writer to close
+# them, and CLOSED files are complete.
+CHANGED = 'changed'
+WRITING = 'writing'
+CLOSED = 'closed'
+
+def is_excluded(path, exclude):
+    return exclude is not None and os.path.realpath(path) == exclude
+
+def scan_files(folder, recursive=False, exclude=None):
+    # Yields (path, stat) for every regular file, skipping the excluded folder.
+    # Like os.walk, symlinked directories are not descended into, so a link
+    # back up the tree cannot report the same files over and over.
+    try:
+        entries = list(os.scandir(folder))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_file():
+                yield entry.path, entry.stat()
+            elif recursive and entry.is_dir(follow_symlinks=False) and not is_excluded(entry.path, exclude):
+                yield from scan_files(entry.path, recursive, exclude)
+        except OSError:
+            continue
+
+def file_signature(stat):
+    return stat.st_mtime_ns, stat.st_size
+
+class PollingWatcher:
+    def __init__(self, folder, recursive=False, exclude=None):
+        self.folder = folder
+        self.recursive = recursive
+        self.exclude = exclude
+        self.index = {path: file_signature(stat) for path, stat in scan_files(folder, recursive, exclude)}
+
+    def existing_files(self):
+        return list(self.index)
+
+    def poll(self, timeout):
+        time.sleep(timeout)
+        changed = []
+        index = {}
+        for path, stat in scan_files(self.folder, self.recursive, self.exclude):
+            signature = file_signature(stat)
+            index[path] = signature
+            if self.index.get(path) != signature:
+                # A listing cannot tell whether a writer is done; the settle
+                # timer decides.
+                changed.append((path, CHANGED))
+        self.index = index
+        return changed
+
+    def close(self):
+        pass
+
+class InotifyWatcher:
+    def __init__(self, folder, recursive=False, exclude=None):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folder = folder
+        self.recursive = recursive
+        self.exclude = exclude
+        self.directories = {}
+        self.existing = []
+        try:
+            self.existing = self.add_directory(folder)
+        except OSError:
+            self.close()
+            raise
+
+    def add_directory(self, folder):
+        wd = self._add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {folder}")
+        self.directories[wd] = folder
+        # Files created before the watch was in place would produce no
+        # events, so report what is already there.
+        files = []
+        for path, _ in scan_files(folder):
+            files.append(path)
+        if self.recursive:
+            for entry in os.scandir(folder):
+                if entry.is_dir(follow_symlinks=False) and not is_excluded(entry.path, self.exclude):
+                    try:
+                        files.extend(self.add_directory(entry.path))
+                    except OSError:
+                        continue
+        return files
+
+    def existing_files(self):
+        return list(self.existing)
+
+    def poll(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        changed = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped; fall back to a full listing.
+                changed.extend((path, CHANGED) for path, _ in scan_files(self.folder, self.recursive, self.exclude))
+                continue
+            if mask & IN_IGNORED:
+                self.directories.pop(wd, None)
+                continue
+            folder = self.directories.get(wd)
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if self.recursive and mask & (IN_CREATE | IN_MOVED_TO) and not is_excluded(path, self.exclude):
+                    try:
+                        changed.extend((path, CHANGED) for path in self.add_directory(path))
+                    except OSError:
+                        continue
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.append((path, CLOSED))
+            elif mask & IN_CREATE and os.path.islink(path):
+                # Symlinks are never opened for writing, so no close follows.
+                changed.append((path, CHANGED))
+            else:
+                # However long the writer pauses, the file is not complete
+                # until it is closed.
+                changed.append((path, WRITING))
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+def create_watcher(folder, recursive=False, exclude=None, backend='auto'):
+    if exclude is not None:
+        exclude = os.path.realpath(exclude)
+    if backend in ('auto', 'inotify'):
+        try:
+            return InotifyWatcher(folder, recursive, exclude)
+        except (OSError, AttributeError, TypeError):
+            if backend == 'inotify':
+                raise
+    return PollingWatcher(folder, recursive, exclude)
+
+def watch_folder(folder, process, accept=None, recursive=False, exclude=None, workers=1,
+                 settle=0.25, interval=0.5, process_existing=True, stop_event=None, backend='auto'):
+    watcher = create_watcher(folder, recursive, exclude, backend)
+    processed = {}
+    pending = {}
+    # At most two jobs per worker are queued so a burst of uploads cannot
+    # pile up unbounded work in memory.
+    slots = threading.BoundedSemaphore(max(workers, 1) * 2)
+    stop_event = stop_event or threading.Event()
+
+    def run(path):
+        try:
+            process(path)
+        finally:
+            slots.release()
+
+    def mark_pending(events, now):
+        for path, state in events:
+            if accept is None or accept(path):
+                # Every new event restarts the settle clock.
+                signature = pending[path][0] if path in pending else None
+                pending[path] = (signature, now, state)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            if process_existing:
+                mark_pending([(path, CHANGED) for path in watcher.existing_files()], time.monotonic())
+            while not stop_event.is_set():
+                timeout = min(settle, interval) if pending else interval
+                mark_pending(watcher.poll(timeout), time.monotonic())
+
+                now = time.monotonic()
+                for path, (signature, since, state) in list(pending.items()):
+                    try:
+                        current = file_signature(os.stat(path))
+                    except OSError:
+                        del pending[path]
+                        continue
+                    if state == WRITING:
+                        continue
+                    if state == CHANGED:
+                        if current != signature:
+                            # Possibly still being written: wait until size
+                            # and mtime hold still for a full settle interval.
+                            pending[path] = (current, now, state)
+                            continue
+                        if now - since < settle:
+                            continue
+                    del pending[path]
+                    if processed.get(path) == current:
+                        continue
+                    processed[path] = current
+                    slots.acquire()
+                    executor.submit(run, path)
+    finally:
+        watcher.close()
+
+def watch_image_folder(input_dir, output_dir, job, workers=1, stop_event=None,
+                       extensions=('.png', '.jpg', '.jpeg')):
+    # Runs ``job(path) -> (output_path, action, detail)`` on every new or
+    # changed image in input_dir, writing into output_dir.
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    # The watch is not recursive, so outputs stay out of it as long as they
+    # go to another folder.
+    if os.path.realpath(output_dir) == os.path.realpath(input_dir):
+        raise ValueError("Watch mode needs an output directory separate from the input directory")
+
+    def accept(path):
+        return path.lower().endswith(extensions)
+
+    def process(path):
+        result = run_file(job, path)
+        if result.ok:
+            print(f"{os.path.basename(path)}: {result.action}")
+
+    print(f"Watching {input_dir} for new images (Ctrl+C to stop)")
+    watch_folder(input_dir, process, accept=accept, workers=workers, stop_event=stop_event)